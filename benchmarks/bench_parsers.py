@@ -0,0 +1,92 @@
+"""
+Compare the legacy BeautifulSoup parsing path with the streaming/compiled one
+on the recorded fixture pages.
+
+    python benchmarks/bench_parsers.py [--repeat 50] [--limit 5]
+
+Prints one JSON object with the mean time per parse (ms) for each path.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from services.parsers import HTML_PARSER, parse_rss_items, get_extractor  # noqa: E402
+from services.sources import NEWS_SOURCES  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def legacy_rss(content, limit):
+    # Previous NewsService.parse_rss_feed: full 'xml' tree, then slice
+    soup = BeautifulSoup(content, 'xml')
+    return [
+        (item.title.text if item.title else '', item.description.text if item.description else '')
+        for item in soup.find_all('item')[:limit]
+    ]
+
+
+def legacy_html(content, item_class, limit):
+    # Previous NewsService.parse_html_page: html.parser and repeated find() calls
+    soup = BeautifulSoup(content, 'html.parser')
+    results = []
+    for item in soup.find_all('div', class_=item_class)[:limit]:
+        title = item.find('h3').get_text(strip=True) if item.find('h3') else ''
+        summary = item.find('p').get_text(strip=True) if item.find('p') else ''
+        link_elem = item.find('a')
+        results.append((title, summary, link_elem['href'] if link_elem and 'href' in link_elem.attrs else ''))
+    return results
+
+
+def chunked(content, size=16384):
+    return (content[i:i + size] for i in range(0, len(content), size))
+
+
+def bench(fn, repeat):
+    return round(min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=5)
+    args = parser.parse_args()
+
+    # Rules are the same data NewsService uses for its sources
+    sources = {source['url'].split('/')[2]: source for source in NEWS_SOURCES}
+    rss = load('google_news_rss.xml')
+    pages = {
+        'www.marketwatch.com': (load('marketwatch_search.html'), 'article__content'),
+        'www.techradar.com': (load('techradar_search.html'), 'article-card'),
+    }
+
+    results = {
+        'html_parser_backend': HTML_PARSER,
+        'rss': {
+            'legacy_ms': bench(lambda: legacy_rss(rss, args.limit), args.repeat),
+            'streaming_ms': bench(lambda: parse_rss_items(chunked(rss), limit=args.limit), args.repeat),
+        }
+    }
+    for host, (content, item_class) in pages.items():
+        extractor = get_extractor(sources[host]['rules'])
+        results[host] = {
+            'legacy_ms': bench(lambda: legacy_html(content, item_class, args.limit), args.repeat),
+            'compiled_ms': bench(lambda: extractor.extract(content, limit=args.limit), args.repeat),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+End-to-end pipeline benchmark against the recorded fixtures, without network access.
+
+    python benchmarks/bench_pipeline.py [--articles 5,20,60] [--concurrency 1,4] [--runs 8]
+                                        [--real-models [--backend int8]] [--output results.json]
+
+Each source is served from benchmarks/fixtures by a local HTTP server, and the models
+are replaced by the cheap stand-ins in standins.py unless --real-models is given.
+For every (articles per source, concurrency) pair, --runs full analyses (fetch_news,
+analyze_sentiment, compare_articles, extract_common_topics, key takeaway and TTS) run
+on a thread pool of that size. Prints one JSON object with articles/sec, p50/p95
+latency per stage and the peak RSS of the process.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), 'src'))
+
+from controllers.news_controller import NewsController  # noqa: E402
+from services.news_service import NewsService  # noqa: E402
+from services.sentiment_analysis import SentimentAnalysisService  # noqa: E402
+from services.text_to_speech import TextToSpeechService, SilentTTSEngine, GTTSEngine  # noqa: E402
+from services.audio_store import AudioStore  # noqa: E402
+from services.model_registry import ModelRegistry  # noqa: E402
+from services.inference_backends import create_inference_backend, INFERENCE_BACKENDS  # noqa: E402
+from services.metrics import start_trace, stage  # noqa: E402
+from standins import StandInTTSEngine, register_standin_models, serve_fixtures  # noqa: E402
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def build_controller(args, audio_dir):
+    models = ModelRegistry()
+    if not args.real_models:
+        register_standin_models(models)
+    backend = create_inference_backend(args.backend, intra_op_threads=args.threads)
+
+    # No result cache: every run pays for its own model work
+    news_service = NewsService(models=models, fetch_deadline=args.fetch_deadline, backend=backend)
+    sentiment_service = SentimentAnalysisService(models=models, backend=backend)
+    if args.tts_engine == 'gtts':
+        engine = GTTSEngine()
+    elif args.tts_engine == 'silent':
+        engine = SilentTTSEngine()
+    else:
+        engine = StandInTTSEngine(latency_ms=args.tts_latency_ms)
+    tts_service = TextToSpeechService(engine=engine, store=AudioStore(os.path.join(audio_dir, 'static')))
+
+    controller = NewsController(
+        news_service, sentiment_service, tts_service,
+        models=models,
+        takeaway_backend=args.takeaway_backend,
+        backend=backend
+    )
+    return controller
+
+
+def analyze(controller, company_name):
+    """
+    One full analysis as the /analyze route runs it. Returns (articles, stage timings).
+    """
+    trace = start_trace()
+    with stage('total'):
+        with stage('fetch_news'):
+            news = controller.get_news(company_name)
+        articles = news['articles']
+        with stage('analyze_sentiment'):
+            sentiment_results = controller.analyze_sentiment(articles)
+        overall_sentiment = controller.calculate_overall_sentiment(sentiment_results)
+        with stage('compare_articles'):
+            controller.compare_articles(articles)
+        with stage('extract_common_topics'):
+            controller.extract_common_topics(articles)
+        key_takeaway = controller.generate_one_line_summary(articles)
+        with stage('text_to_speech'):
+            controller.convert_text_to_speech(
+                f"The overall sentiment for {company_name} news is {overall_sentiment}. Key insight: {key_takeaway}"
+            )
+    return len(articles), trace.stages
+
+
+def summarize_latencies(stages):
+    timings = {}
+    for entry in stages:
+        timings.setdefault(entry['stage'], []).append(entry['ms'])
+    return {
+        name: {
+            'count': len(values),
+            'p50_ms': round(float(np.percentile(values, 50)), 2),
+            'p95_ms': round(float(np.percentile(values, 95)), 2)
+        }
+        for name, values in sorted(timings.items())
+    }
+
+
+def run_config(controller, articles_per_source, concurrency, runs):
+    controller.news_service.max_items_per_source = articles_per_source
+    # Distinct company names keep TTS output and conditional GET state from being reused
+    companies = [f"Company {articles_per_source}-{concurrency}-{run}" for run in range(runs)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda company: analyze(controller, company), companies))
+    elapsed = time.perf_counter() - start
+
+    article_count = sum(count for count, _ in results)
+    return {
+        'articles_per_source': articles_per_source,
+        'concurrency': concurrency,
+        'runs': runs,
+        'articles': article_count,
+        'seconds': round(elapsed, 3),
+        'articles_per_sec': round(article_count / elapsed, 2) if elapsed else None,
+        'stages': summarize_latencies([entry for _, stages in results for entry in stages]),
+        # Process high-water mark, so it includes every configuration run before this one
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int_list, default=[5, 20, 60],
+                        help='comma separated articles per source (the fixtures hold up to 60)')
+    parser.add_argument('--concurrency', type=int_list, default=[1, 4],
+                        help='comma separated numbers of concurrent analyses')
+    parser.add_argument('--runs', type=int, default=8, help='analyses per configuration')
+    parser.add_argument('--real-models', action='store_true', help='load the real models instead of stand-ins')
+    parser.add_argument('--backend', choices=INFERENCE_BACKENDS, default='pytorch',
+                        help='inference backend for the real models')
+    parser.add_argument('--threads', type=int, default=None, help='intra-op threads for the real models')
+    parser.add_argument('--takeaway-backend', default='centroid')
+    parser.add_argument('--tts-engine', choices=['standin', 'silent', 'gtts'], default='standin')
+    parser.add_argument('--tts-latency-ms', type=float, default=0, help='per-chunk delay of the stand-in TTS engine')
+    parser.add_argument('--server-latency-ms', type=float, default=0, help='delay of the local fixture servers')
+    parser.add_argument('--fetch-deadline', type=float, default=15)
+    parser.add_argument('--output', help='also write the JSON results to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as audio_dir:
+        controller = build_controller(args, audio_dir)
+        servers = serve_fixtures(controller.news_service.news_sources, latency_ms=args.server_latency_ms)
+        try:
+            rss_before_models = peak_rss_mb()
+            # Untimed run so model loading is not counted as stage latency
+            warmup_start = time.perf_counter()
+            analyze(controller, 'Warmup')
+            warmup_seconds = time.perf_counter() - warmup_start
+
+            results = [
+                run_config(controller, articles_per_source, concurrency, args.runs)
+                for articles_per_source in args.articles
+                for concurrency in args.concurrency
+            ]
+        finally:
+            for server in servers:
+                server.stop()
+
+    report = {
+        'config': {
+            'real_models': args.real_models,
+            'backend': args.backend,
+            'threads': args.threads,
+            'takeaway_backend': args.takeaway_backend,
+            'tts_engine': args.tts_engine,
+            'server_latency_ms': args.server_latency_ms,
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count()
+        },
+        'warmup_seconds': round(warmup_seconds, 3),
+        'models': controller.models.status(),
+        'peak_rss_mb_before_models': rss_before_models,
+        'results': results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
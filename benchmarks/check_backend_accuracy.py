@@ -0,0 +1,159 @@
+"""
+Compare a quantized or ONNX Runtime backend against the fp32 PyTorch baseline on the
+recorded fixture text, and time both.
+
+    python benchmarks/check_backend_accuracy.py --backend int8 [--models sentiment,semantic,summarizer]
+                                                [--texts 64] [--threads 1]
+
+For sentiment it reports label agreement and score differences, for embeddings the
+cosine similarity to the baseline vectors, and for summaries the token overlap with
+the baseline summaries. Prints one JSON object and exits with status 1 when a model
+falls outside the thresholds, so it can gate a backend change in CI.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from services.parsers import get_extractor  # noqa: E402
+from services.news_service import NewsService  # noqa: E402
+from services.sources import NEWS_SOURCES  # noqa: E402
+from services.sentiment_analysis import SentimentAnalysisService  # noqa: E402
+from services.model_registry import ModelRegistry  # noqa: E402
+from services.inference_backends import PyTorchBackend, create_inference_backend, INFERENCE_BACKENDS  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SEMANTIC_MODEL = 'all-MiniLM-L6-v2'
+
+
+def fixture_texts(limit):
+    """
+    Title and teaser of the articles on the recorded HTML pages, interleaved by source.
+    """
+    pages = {'www.marketwatch.com': 'marketwatch_search.html', 'www.techradar.com': 'techradar_search.html'}
+    per_source = []
+    for source in NEWS_SOURCES:
+        host = source['url'].split('/')[2]
+        if host not in pages:
+            continue
+        with open(os.path.join(FIXTURES, pages[host]), 'rb') as f:
+            items = get_extractor(source['rules']).extract(f.read(), limit=limit)
+        per_source.append([f"{item['title']}. {item['summary']}" for item in items if item['title']])
+    texts = [text for group in zip(*per_source) for text in group]
+    return texts[:limit]
+
+
+def timed(fn, texts):
+    fn(texts[:2])  # Warm up kernels and session allocations
+    start = time.perf_counter()
+    outputs = fn(texts)
+    return outputs, round((time.perf_counter() - start) * 1000 / len(texts), 2)
+
+
+def check_sentiment(baseline, candidate, texts, args):
+    services = [SentimentAnalysisService(models=ModelRegistry(), backend=backend) for backend in (baseline, candidate)]
+    (expected, baseline_ms), (actual, candidate_ms) = [timed(s.get_sentiment_scores_batch, texts) for s in services]
+
+    # None marks a text the model failed on; it counts as a disagreement with the largest score difference
+    scored = [e is not None and a is not None for e, a in zip(expected, actual)]
+    agreement = np.mean([ok and e[0] == a[0] for ok, e, a in zip(scored, expected, actual)])
+    diffs = np.array([
+        [abs(e[1][label] - a[1][label]) if ok else 1.0 for label in ('negative', 'neutral', 'positive')]
+        for ok, e, a in zip(scored, expected, actual)
+    ])
+    result = {
+        'label_agreement': round(float(agreement), 4),
+        'max_score_diff': round(float(diffs.max()), 4),
+        'mean_score_diff': round(float(diffs.mean()), 4),
+        'failed_texts': scored.count(False),
+        'baseline_ms_per_text': baseline_ms,
+        'candidate_ms_per_text': candidate_ms
+    }
+    result['passed'] = result['label_agreement'] >= args.min_label_agreement and result['max_score_diff'] <= args.max_score_diff
+    return result
+
+
+def check_semantic(baseline, candidate, texts, args):
+    encoders = [backend.load_sentence_encoder(SEMANTIC_MODEL) for backend in (baseline, candidate)]
+    (expected, baseline_ms), (actual, candidate_ms) = [
+        timed(lambda batch, encoder=encoder: encoder.encode(batch, convert_to_numpy=True), texts) for encoder in encoders
+    ]
+
+    expected = expected / np.linalg.norm(expected, axis=1, keepdims=True)
+    actual = actual / np.linalg.norm(actual, axis=1, keepdims=True)
+    cosine = (expected * actual).sum(axis=1)
+    result = {
+        'min_cosine': round(float(cosine.min()), 4),
+        'mean_cosine': round(float(cosine.mean()), 4),
+        'baseline_ms_per_text': baseline_ms,
+        'candidate_ms_per_text': candidate_ms
+    }
+    result['passed'] = result['min_cosine'] >= args.min_cosine
+    return result
+
+
+def token_f1(expected, actual):
+    # None marks a text the model failed on
+    if expected is None or actual is None:
+        return 0.0
+    expected, actual = expected.lower().split(), actual.lower().split()
+    common = sum(min(expected.count(token), actual.count(token)) for token in set(expected))
+    if not common:
+        return 0.0
+    precision, recall = common / len(actual), common / len(expected)
+    return 2 * precision * recall / (precision + recall)
+
+
+def check_summarizer(baseline, candidate, texts, args):
+    services = [NewsService(models=ModelRegistry(), backend=backend) for backend in (baseline, candidate)]
+    (expected, baseline_ms), (actual, candidate_ms) = [timed(s.summarize_batch, texts) for s in services]
+
+    scores = [token_f1(e, a) for e, a in zip(expected, actual)]
+    result = {
+        'exact_match': round(float(np.mean([e == a for e, a in zip(expected, actual)])), 4),
+        'mean_token_f1': round(float(np.mean(scores)), 4),
+        'min_token_f1': round(float(np.min(scores)), 4),
+        'baseline_ms_per_text': baseline_ms,
+        'candidate_ms_per_text': candidate_ms
+    }
+    result['passed'] = result['mean_token_f1'] >= args.min_summary_f1
+    return result
+
+
+CHECKS = {'sentiment': check_sentiment, 'semantic': check_semantic, 'summarizer': check_summarizer}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', choices=[name for name in INFERENCE_BACKENDS if name != 'pytorch'], required=True)
+    parser.add_argument('--models', default='sentiment,semantic', help=f"comma separated, from {', '.join(CHECKS)}")
+    parser.add_argument('--texts', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=None, help='intra-op threads for both backends')
+    parser.add_argument('--export-dir', default=None, help='reuse/write ONNX exports here')
+    parser.add_argument('--min-label-agreement', type=float, default=0.95)
+    parser.add_argument('--max-score-diff', type=float, default=0.05)
+    parser.add_argument('--min-cosine', type=float, default=0.99)
+    parser.add_argument('--min-summary-f1', type=float, default=0.8)
+    args = parser.parse_args()
+
+    texts = fixture_texts(args.texts)
+    baseline = PyTorchBackend(intra_op_threads=args.threads)
+    candidate = create_inference_backend(args.backend, intra_op_threads=args.threads, export_dir=args.export_dir)
+
+    results = {'backend': args.backend, 'texts': len(texts), 'threads': args.threads, 'models': {}}
+    for model in args.models.split(','):
+        results['models'][model] = CHECKS[model](baseline, candidate, texts, args)
+    results['passed'] = all(result['passed'] for result in results['models'].values())
+
+    print(json.dumps(results, indent=2))
+    sys.exit(0 if results['passed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Offline stand-ins for the pipeline benchmark: a local HTTP server for the recorded
+fixture pages, cheap deterministic models with the same call signatures as the real
+ones, and a TTS engine that does not touch the network.
+
+The stand-in models measure the pipeline around the models (fetching, parsing,
+dedup, batching, caching, similarity), not model quality.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from services.text_to_speech import TTSEngine
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# NewsService source host -> recorded page served in its place
+SOURCE_FIXTURES = {
+    'news.google.com': ('google_news_rss.xml', 'application/rss+xml; charset=utf-8'),
+    'www.marketwatch.com': ('marketwatch_search.html', 'text/html; charset=utf-8'),
+    'www.techradar.com': ('techradar_search.html', 'text/html; charset=utf-8'),
+}
+
+
+class FixtureServer:
+    """
+    Serves one recorded page on its own local port, for any path and query,
+    after an optional artificial delay standing in for network latency.
+    Each source gets its own server so sources keep distinct host names.
+    """
+
+    def __init__(self, fixture, content_type, latency_ms=0):
+        with open(os.path.join(FIXTURES, fixture), 'rb') as f:
+            body = f.read()
+        delay = latency_ms / 1000.0
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if delay:
+                    time.sleep(delay)
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='fixture-server', daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def serve_fixtures(news_sources, latency_ms=0):
+    """
+    Start a fixture server per source and point the sources (NewsService.news_sources,
+    modified in place) at them. Returns the started servers.
+    """
+    servers = []
+    for source in news_sources:
+        _, _, host, path = source['url'].split('/', 3)
+        fixture, content_type = SOURCE_FIXTURES[host]
+        server = FixtureServer(fixture, content_type, latency_ms).start()
+        source['url'] = f"{server.base_url}/{path}"
+        servers.append(server)
+    return servers
+
+
+WORD = re.compile(r"[A-Za-z][A-Za-z'-]+")
+
+
+class StandInWordTokenizer:
+    """
+    Word-level tokenizer with the parts of the transformers tokenizer API the
+    summarization path uses; ids are assigned on first sight.
+    """
+    model_max_length = 1024
+    pad_token_id, bos_token_id, eos_token_id = 0, 1, 2
+
+    def __init__(self):
+        self.vocab = {}
+        self.words = ['<pad>', '<s>', '</s>']
+        self.lock = threading.Lock()
+
+    def _id(self, word):
+        with self.lock:
+            if word not in self.vocab:
+                self.vocab[word] = len(self.words)
+                self.words.append(word)
+            return self.vocab[word]
+
+    def __call__(self, texts, add_special_tokens=True, **kwargs):
+        texts = [texts] if isinstance(texts, str) else texts
+        ids = [[self._id(word) for word in text.split()] for text in texts]
+        if add_special_tokens:
+            ids = [self.build_inputs_with_special_tokens(row) for row in ids]
+        return {'input_ids': ids}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [self.bos_token_id] + list(ids) + [self.eos_token_id]
+
+    def pad(self, encoded, return_tensors='pt'):
+        rows = encoded['input_ids']
+        width = max(len(row) for row in rows)
+        return {
+            'input_ids': torch.tensor([row + [self.pad_token_id] * (width - len(row)) for row in rows]),
+            'attention_mask': torch.tensor([[1] * len(row) + [0] * (width - len(row)) for row in rows])
+        }
+
+    def decode(self, ids, skip_special_tokens=True, **kwargs):
+        ids = ids.tolist() if hasattr(ids, 'tolist') else ids
+        return ' '.join(self.words[i] for i in ids if not (skip_special_tokens and i < 3))
+
+    def batch_decode(self, rows, skip_special_tokens=True, **kwargs):
+        return [self.decode(row, skip_special_tokens) for row in rows]
+
+
+class StandInSeq2Seq:
+    """
+    generate() keeps the first max_length input tokens (lead summary).
+    """
+
+    def generate(self, input_ids, attention_mask=None, max_length=130, min_length=0, **kwargs):
+        return input_ids[:, :max_length]
+
+
+class StandInSummarizer:
+    """
+    Summarization pipeline stand-in: callable on text, with tokenizer and model
+    attributes for the pre-tokenized path.
+    """
+
+    def __init__(self):
+        self.tokenizer = StandInWordTokenizer()
+        self.model = StandInSeq2Seq()
+
+    def __call__(self, texts, max_length=130, min_length=30, **kwargs):
+        texts = [texts] if isinstance(texts, str) else texts
+        return [{'summary_text': ' '.join(text.split()[:max_length])} for text in texts]
+
+
+class StandInNLP:
+    """
+    Minimal spaCy stand-in: runs of capitalized words become ORG entities and
+    adjacent lower-case word pairs become noun chunks.
+    """
+
+    def _doc(self, text):
+        words = WORD.findall(text)
+        ents, run = [], []
+        for word in words + ['.']:
+            if word[0].isupper():
+                run.append(word)
+            elif run:
+                ents.append(SimpleNamespace(text=' '.join(run), label_='ORG'))
+                run = []
+        lower = [word for word in words if word.islower() and len(word) > 3]
+        chunks = [SimpleNamespace(text=f"{a} {b}") for a, b in zip(lower, lower[1:])]
+        return SimpleNamespace(ents=ents, noun_chunks=chunks)
+
+    def pipe(self, texts, batch_size=32, n_process=1):
+        for text in texts:
+            yield self._doc(text)
+
+
+POSITIVE = {'beats', 'gains', 'growth', 'record', 'rises', 'surges', 'wins', 'launch', 'strong', 'upgrade'}
+NEGATIVE = {'misses', 'falls', 'probe', 'lawsuit', 'cuts', 'drops', 'recall', 'weak', 'delay', 'antitrust'}
+
+
+class StandInTokenizer:
+    """
+    Counts lexicon hits per text instead of producing token ids.
+    """
+
+    def __call__(self, texts, return_tensors='pt', padding=False, truncation=True, max_length=512):
+        texts = [texts] if isinstance(texts, str) else texts
+        counts = []
+        for text in texts:
+            words = [word.lower() for word in WORD.findall(text)[:max_length]]
+            counts.append([sum(word in NEGATIVE for word in words), 1, sum(word in POSITIVE for word in words)])
+        return {'counts': torch.tensor(counts, dtype=torch.float32)}
+
+
+class StandInClassifier:
+    """
+    Turns lexicon counts into [negative, neutral, positive] logits.
+    """
+
+    def __call__(self, counts):
+        return SimpleNamespace(logits=counts * 2.0)
+
+
+class StandInEncoder:
+    """
+    SentenceTransformer stand-in: hashed bag-of-words vectors.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word, count in Counter(word.lower() for word in WORD.findall(text)).items():
+                bucket = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=4).digest(), 'little')
+                vectors[row, bucket % self.dim] += count
+        return vectors
+
+
+class StandInTTSEngine(TTSEngine):
+    """
+    Returns placeholder bytes sized like a short MP3, after an optional per-chunk delay.
+    """
+    name = 'standin'
+
+    def __init__(self, latency_ms=0, bytes_per_char=200):
+        self.delay = latency_ms / 1000.0
+        self.bytes_per_char = bytes_per_char
+
+    def synthesize(self, text, lang):
+        if self.delay:
+            time.sleep(self.delay)
+        return b'\xff\xfb' * (len(text) * self.bytes_per_char // 2)
+
+
+def register_standin_models(models):
+    """
+    Register stand-ins under the names the services use, as overrides, so the
+    loaders the services register for the real models are ignored.
+    """
+    models.register('summarizer', StandInSummarizer, override=True)
+    models.register('spacy', StandInNLP, override=True)
+    models.register('sentiment', lambda: (StandInTokenizer(), StandInClassifier()), override=True)
+    models.register('semantic', StandInEncoder, override=True)
@@ -1,10 +1,14 @@
-from flask import Flask, request, jsonify, render_template, url_for
+from flask import Flask, Response, request, jsonify, render_template, url_for, stream_with_context
+import functools
+import json
+import multiprocessing
 import os
 import time
-from controllers.news_controller import NewsController
-from services.news_service import NewsService
-from services.sentiment_analysis import SentimentAnalysisService
-from services.text_to_speech import TextToSpeechService
+from controllers.factory import build_news_controller
+from services.job_queue import SQLiteJobBroker, WorkerPool, QueueFullError
+from services.feed_poller import FeedPoller
+from services.metrics import METRICS, start_trace, current_trace
+from services.model_server import ModelServerClient
 
 app = Flask(__name__, 
     template_folder=os.path.join(os.path.dirname(__file__), 'templates'),
@@ -18,42 +22,157 @@ os.makedirs(app.static_folder, exist_ok=True)
 # Add zip to Jinja2 environment
 app.jinja_env.globals.update(zip=zip)
 
-# Initialize services
-news_service = NewsService()
-sentiment_service = SentimentAnalysisService()
-tts_service = TextToSpeechService()
+# Services and models are configured from the environment (see controllers/factory.py)
+news_controller = build_news_controller()
+model_registry = news_controller.models
+result_cache = news_controller.cache
+# With MODEL_SERVER_SOCKET set the models live in the model server and this process only forwards calls
+model_client = news_controller.scheduler if isinstance(news_controller.scheduler, ModelServerClient) else None
 
-news_controller = NewsController(news_service, sentiment_service, tts_service)
+# Analysis jobs run on a bounded pool of worker processes, each with its own models.
+# The pool is started on the first submission so importing the app stays cheap.
+job_broker_factory = functools.partial(
+    SQLiteJobBroker,
+    os.environ.get('JOB_DB', os.path.join(os.path.dirname(__file__), 'data', 'jobs.db')),
+    max_pending=int(os.environ.get('JOB_QUEUE_SIZE', 100)),
+    # A job whose worker stops renewing its lease for this long is run again
+    lease_seconds=float(os.environ.get('JOB_LEASE_SECONDS', 120))
+)
+job_broker = job_broker_factory()
+job_workers = WorkerPool(
+    job_broker_factory,
+    build_news_controller,
+    workers=int(os.environ.get('JOB_WORKERS', 2))
+)
+
+WINDOW_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+def parse_window(value):
+    """
+    Parse a window such as '30m', '24h', '7d' or a number of seconds.
+    """
+    value = value.strip().lower()
+    if value and value[-1] in WINDOW_UNITS:
+        return float(value[:-1]) * WINDOW_UNITS[value[-1]]
+    return float(value)
+
+# Background polling for a watchlist (WATCHLIST="Apple,Tesla,..."); /analyze serves watched
+# companies from the articles stored within WATCHED_WINDOW (default 24h) and only fetches
+# live while nothing is stored yet. Per-host intervals in seconds: POLL_INTERVALS="news.google.com=600,..."
+feed_poller = FeedPoller(
+    news_controller,
+    os.environ.get('WATCHLIST', '').split(','),
+    intervals={
+        host: float(seconds)
+        for host, seconds in (item.split('=') for item in os.environ.get('POLL_INTERVALS', '').split(',') if '=' in item)
+    },
+    default_interval=float(os.environ.get('POLL_INTERVAL', 900)),
+    per_host_concurrency=int(os.environ.get('POLL_HOST_CONCURRENCY', 2))
+)
+watched_window = parse_window(os.environ.get('WATCHED_WINDOW', '24h'))
+
+def stored_window(company_name):
+    """
+    Window to serve a company from the article store, or None to analyze it live.
+    """
+    if news_controller.article_store is not None and feed_poller.is_watched(company_name):
+        return watched_window
+    return None
+
+# Background threads only run in the web process, not in spawned job workers re-importing this module
+if multiprocessing.parent_process() is None:
+    # Set WARM_MODELS=1 to preload every model in the background while already serving requests
+    if os.environ.get('WARM_MODELS', '0') == '1' and model_client is None:
+        model_registry.warm(background=True)
+    if feed_poller.watchlist:
+        feed_poller.start()
+
+@app.before_request
+def begin_trace():
+    start_trace()
+
+@app.after_request
+def add_server_timing(response):
+    # Per-stage durations for browser devtools; streamed responses have not run yet at this point
+    trace = current_trace()
+    if trace is not None and trace.stages:
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """
+    Stage latency, batch size, fetch and cache metrics in the Prometheus text format.
+    """
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def home():
     return render_template('index.html')
 
+@app.route('/ready')
+def readiness():
+    """
+    Report the state of every model. With WARM_MODELS=1 this answers 503 until all of
+    them are loaded; with lazy loading models load on first use, so it answers 200.
+    """
+    if model_client is not None:
+        try:
+            status = model_client.status()
+        except Exception as e:
+            return jsonify({'ready': False, 'error': str(e)}), 503
+        return jsonify(status), 200 if status['ready'] else 503
+    ready = model_registry.ready()
+    return jsonify({'ready': ready, 'lazy': not model_registry.warming, 'models': model_registry.status()}), 200 if ready else 503
+
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify({**result_cache.stats, 'hit_rate': result_cache.hit_rate()})
+
+@app.route('/poller/stats')
+def poller_stats():
+    return jsonify({**feed_poller.stats_snapshot(), 'watchlist': feed_poller.watchlist})
+
+@app.route('/inference/stats')
+def inference_stats():
+    """
+    Batch-size and queue-wait histograms per model when cross-request batching is enabled.
+    """
+    scheduler = news_controller.scheduler
+    return jsonify(scheduler.stats() if scheduler is not None else {})
+
 @app.route('/analyze', methods=['POST'])
 def analyze_company():
     company_name = request.form.get('company_name')
     if not company_name:
         return jsonify({'error': 'Company name is required'}), 400
 
-    # Fetch news articles
-    articles_data = news_controller.get_news(company_name)
-    if not articles_data['articles']:
-        return render_template('results.html', error="No news articles found")
+    # Watched companies: the poller has already summarized and scored their articles
+    articles, sentiment_results = [], []
+    window_seconds = stored_window(company_name)
+    if window_seconds is not None:
+        articles, sentiment_results = news_controller.get_stored_news(company_name, window_seconds)
+
+    if not articles:
+        # Fetch news articles
+        articles = news_controller.get_news(company_name)['articles']
+        if not articles:
+            return render_template('results.html', error="No news articles found")
 
-    # Analyze sentiment
-    sentiment_results = news_controller.analyze_sentiment(articles_data['articles'])
+        # Analyze sentiment
+        sentiment_results = news_controller.analyze_sentiment(articles)
     
     # Calculate overall sentiment
     overall_sentiment = news_controller.calculate_overall_sentiment(sentiment_results)
     
     # Compare articles
-    coverage_differences = news_controller.compare_articles(articles_data['articles'])
+    coverage_differences = news_controller.compare_articles(articles)
     
     # Extract common topics
-    common_topics = news_controller.extract_common_topics(articles_data['articles'])
+    common_topics = news_controller.extract_common_topics(articles)
     
     # Generate a key takeaway
-    key_takeaway = news_controller.generate_one_line_summary(articles_data['articles'])
+    key_takeaway = news_controller.generate_one_line_summary(articles)
     
     # Combine overall sentiment and key takeaway for TTS
     tts_text = f"The overall sentiment for {company_name} news is {overall_sentiment}. Key insight: {key_takeaway}"
@@ -61,7 +180,7 @@ def analyze_company():
 
     return render_template(
         'results.html',
-        articles=articles_data['articles'],
+        articles=articles,
         sentiment_results=sentiment_results,
         overall_sentiment=overall_sentiment,
         audio_file=audio_file,
@@ -69,6 +188,115 @@ def analyze_company():
         common_topics=common_topics
     )
 
+@app.route('/analyze/stream', methods=['GET', 'POST'])
+def analyze_company_stream():
+    """
+    Server-sent events variant of /analyze: each article is sent as soon as it
+    is summarized and scored, followed by the comparison, takeaway and audio URL.
+    """
+    company_name = request.values.get('company_name')
+    if not company_name:
+        return jsonify({'error': 'Company name is required'}), 400
+
+    def events():
+        try:
+            for event, data in news_controller.analyze_stream(company_name, window_seconds=stored_window(company_name)):
+                if event == 'audio' and data['audio_file']:
+                    data['audio_url'] = url_for('static', filename=data['audio_file'])
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            print(f"Error in streaming analysis: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': 'Analysis failed'})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/analyze/window')
+def analyze_company_window():
+    """
+    Windowed sentiment/topic aggregates from the article store; only unseen articles are processed.
+    """
+    company_name = request.args.get('company_name')
+    if not company_name:
+        return jsonify({'error': 'Company name is required'}), 400
+    try:
+        window_seconds = parse_window(request.args.get('window', '24h'))
+    except ValueError:
+        return jsonify({'error': 'Invalid window, use e.g. 30m, 24h or 7d'}), 400
+
+    # Watched companies are kept fresh by the poller, so by default they are a pure read
+    default_refresh = '0' if feed_poller.is_watched(company_name) else '1'
+    refresh = request.args.get('refresh', default_refresh) != '0'
+    result = news_controller.analyze_window(company_name, window_seconds, refresh=refresh)
+    # ?timings=1 adds the per-stage latency breakdown of this request
+    if request.args.get('timings') == '1':
+        result['timings'] = current_trace().breakdown()
+    return jsonify(result)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue an analysis and return its job id; answers 429 when the queue is full.
+    """
+    company_name = request.values.get('company_name')
+    if not company_name:
+        return jsonify({'error': 'Company name is required'}), 400
+
+    job_workers.start()
+    try:
+        job_id = job_broker.submit({'company_name': company_name})
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+    return jsonify({'job_id': job_id, 'status_url': url_for('job_status', job_id=job_id)}), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """
+    Poll a job; `since` skips progress events the client has already seen.
+    Events restart from 0 when `attempt` changes (the job was run again).
+    """
+    job = job_broker.get(job_id, since=request.args.get('since', 0, type=int))
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    """
+    Server-sent events for a queued job, relayed from the broker until it finishes.
+    A `restart` event tells the client to drop what it has shown: the worker running
+    the job died and another attempt is producing the results again.
+    """
+    if job_broker.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def events():
+        since, attempt = 0, None
+        while True:
+            job = job_broker.get(job_id, since=since)
+            if attempt is not None and job['attempt'] != attempt:
+                yield "event: restart\ndata: {}\n\n"
+                since = 0
+                job = job_broker.get(job_id)
+            attempt = job['attempt']
+            for item in job['events']:
+                yield f"event: {item['event']}\ndata: {json.dumps(item['data'])}\n\n"
+                since = item['seq'] + 1
+            if job['status'] in ('done', 'failed'):
+                yield f"event: {job['status']}\ndata: {json.dumps({'error': job['error']})}\n\n"
+                return
+            time.sleep(0.5)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 os.makedirs(os.path.join(os.path.dirname(__file__), 'static'), exist_ok=True)
 
 if __name__ == '__main__':
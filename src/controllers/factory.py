@@ -0,0 +1,103 @@
+import os
+from controllers.news_controller import NewsController
+from services.news_service import NewsService
+from services.sentiment_analysis import SentimentAnalysisService
+from services.text_to_speech import TextToSpeechService, GTTSEngine, SilentTTSEngine
+from services.result_cache import ResultCache
+from services.audio_store import AudioStore
+from services.article_store import ArticleStore
+from services.model_registry import ModelRegistry
+from services.inference_scheduler import InferenceScheduler
+from services.inference_backends import create_inference_backend, RemoteBackend
+from services.model_server import ModelServerClient
+
+
+def build_news_controller(scheduler=None):
+    """
+    Build the services and controller from environment settings.
+    Used by the Flask app, by job worker processes, which each build their own copy,
+    and by the model server, which passes in the scheduler it serves from.
+    """
+    # Shared cache for model outputs; set RESULT_CACHE_DB to keep it across restarts
+    result_cache = ResultCache(
+        max_bytes=int(os.environ.get('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+        db_path=os.environ.get('RESULT_CACHE_DB'),
+        max_disk_bytes=int(os.environ.get('RESULT_CACHE_DISK_MAX_BYTES', 512 * 1024 * 1024)),
+        max_age_seconds=int(os.environ.get('RESULT_CACHE_MAX_AGE', 30 * 24 * 3600))
+    )
+
+    # Models are loaded lazily on first use; nothing heavy happens at import time
+    model_registry = ModelRegistry()
+
+    # MODEL_SERVER_SOCKET makes this process a thin client of the model server (model_server.py),
+    # so no models are loaded here; otherwise INFERENCE_MAX_WAIT_MS > 0 batches model calls
+    # across concurrent requests in this process
+    if scheduler is None:
+        max_wait_ms = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 0))
+        if os.environ.get('MODEL_SERVER_SOCKET'):
+            scheduler = ModelServerClient(
+                os.environ['MODEL_SERVER_SOCKET'],
+                authkey=os.environ.get('MODEL_SERVER_AUTHKEY', '').encode('utf-8') or None
+            )
+        elif max_wait_ms > 0:
+            scheduler = InferenceScheduler(
+                max_batch_size=int(os.environ.get('INFERENCE_MAX_BATCH', 32)),
+                max_wait_ms=max_wait_ms
+            )
+
+    # INFERENCE_BACKEND=int8 or onnx runs the models quantized or in ONNX Runtime; single models
+    # can be overridden with INFERENCE_BACKENDS="summarizer=onnx,sentiment=int8,semantic=onnx,takeaway=int8".
+    # Clients of a model server use the backends the server reports, so cached results stay apart
+    default_backend = os.environ.get('INFERENCE_BACKEND', 'pytorch')
+    backend_names = {
+        model: name
+        for model, name in (item.split('=') for item in os.environ.get('INFERENCE_BACKENDS', '').split(',') if '=' in item)
+    }
+    backends = {}
+
+    def backend_for(model):
+        if isinstance(scheduler, ModelServerClient):
+            return RemoteBackend(scheduler, model)
+        name = backend_names.get(model, default_backend)
+        if name not in backends:
+            backends[name] = create_inference_backend(
+                name,
+                intra_op_threads=int(os.environ.get('INFERENCE_THREADS', 0)) or None,
+                inter_op_threads=int(os.environ.get('INFERENCE_INTER_OP_THREADS', 0)) or None,
+                export_dir=os.environ.get('ONNX_EXPORT_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'onnx'))
+            )
+        return backends[name]
+
+    # Initialize services
+    news_service = NewsService(cache=result_cache, models=model_registry, scheduler=scheduler,
+                               backend=backend_for('summarizer'))
+    sentiment_service = SentimentAnalysisService(cache=result_cache, models=model_registry, scheduler=scheduler,
+                                                 backend=backend_for('sentiment'))
+    # TTS_ENGINE=silent swaps gTTS for an offline stand-in
+    tts_engine = SilentTTSEngine() if os.environ.get('TTS_ENGINE') == 'silent' else GTTSEngine()
+    audio_store = AudioStore(
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static'),
+        max_bytes=int(os.environ.get('AUDIO_STORE_MAX_BYTES', 256 * 1024 * 1024)),
+        max_age_seconds=int(os.environ.get('AUDIO_STORE_MAX_AGE', 7 * 24 * 3600)),
+        index_path=os.environ.get('AUDIO_STORE_INDEX', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'audio_index.db'))
+    )
+    tts_service = TextToSpeechService(engine=tts_engine, store=audio_store)
+
+    # Processed articles are kept per company for incremental, windowed analysis
+    # and near-duplicates of stored stories from other sources are not processed again
+    article_store = ArticleStore(
+        os.environ.get('ARTICLE_DB', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'articles.db')),
+        deduplicator=news_service.deduplicator
+    )
+
+    # TAKEAWAY_BACKEND=centroid or seq2seq avoids loading the 7B LLaMA model
+    return NewsController(
+        news_service, sentiment_service, tts_service,
+        cache=result_cache,
+        models=model_registry,
+        takeaway_backend=os.environ.get('TAKEAWAY_BACKEND', 'llama'),
+        scheduler=scheduler,
+        article_store=article_store,
+        backend=backend_for('semantic'),
+        takeaway_inference_backend=backend_for('takeaway')
+    )
@@ -1,41 +1,68 @@
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
-from sentence_transformers import SentenceTransformer, util
 from langchain.memory import ConversationBufferMemory
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import numpy as np
+import torch
+from services.model_registry import ModelRegistry
+from services.inference_backends import PyTorchBackend
+from services.takeaway import create_takeaway_backend, FALLBACK_TAKEAWAY
+from services.metrics import stage
+from news_types.index import ArticleBatch
 
 class NewsController:
-    def __init__(self, news_service, sentiment_service, tts_service):
+    def __init__(self, news_service, sentiment_service, tts_service, cache=None, models=None,
+                 takeaway_backend='llama', scheduler=None, article_store=None, backend=None,
+                 takeaway_inference_backend=None):
         self.news_service = news_service
         self.sentiment_service = sentiment_service
         self.tts_service = tts_service
-        self.semantic_model = SentenceTransformer('all-MiniLM-L6-v2')  # For semantic similarity
+        self.semantic_model_name = 'all-MiniLM-L6-v2'
+        # Optional ResultCache shared with the services
+        self.cache = cache
+        # Optional ArticleStore for incremental, time-windowed analysis
+        self.article_store = article_store
+        # Optional InferenceScheduler that merges embedding work across concurrent requests
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.register('semantic', self._encode_batch)
+            # One item per request (its summaries); generation is not batched, only serialized
+            scheduler.register('takeaway', self._generate_takeaways, max_batch_size=1)
         self.memory = ConversationBufferMemory(memory_key="chat_history", output_key="output", return_messages=True)
 
-        # Load LLaMA 2 or similar model
-        self.tokenizer = AutoTokenizer.from_pretrained("meta-llama/Llama-2-7b-hf", use_auth_token=True)  # Replace with LLaMA 3 if available
-        self.model = AutoModelForCausalLM.from_pretrained("meta-llama/Llama-2-7b-hf", device_map="auto")
-        self.summarizer = pipeline("text-generation", model=self.model, tokenizer=self.tokenizer, use_auth_token=True, device_map="auto")
+        # Models are loaded on first use through the (optionally shared) registry
+        self.models = models or ModelRegistry()
+        # Runtime for the embedding model: fp32 PyTorch by default, or int8/ONNX (see inference_backends.py)
+        self.backend = backend or PyTorchBackend()
+        self.models.register('semantic', lambda: self.backend.load_sentence_encoder(self.semantic_model_name))  # For semantic similarity
+
+        # Key takeaway backend: 'llama' (7B causal LM), 'seq2seq' (distilled BART) or
+        # 'centroid' (extractive, reuses the MiniLM embeddings and loads nothing extra)
+        self.takeaway = create_takeaway_backend(
+            takeaway_backend, self.models, self.encode_summaries,
+            inference_backend=takeaway_inference_backend or self.backend
+        )
+
+    @property
+    def semantic_model(self):
+        return self.models.get('semantic')
 
     def generate_one_line_summary(self, articles):
         """
-        Generate a concise summary that highlights the key takeaway from all articles using LLaMA 2 or similar models.
+        Generate a concise summary that highlights the key takeaway from all articles
+        using the configured takeaway backend.
         """
-        # Combine all article summaries into one text      
-        combined_text = " ".join([article['summary'] for article in articles])
-
-        # Ensure the text is not too long for the model
-        max_chars = 1024
-        if len(combined_text) > max_chars:
-            combined_text = combined_text[:max_chars]
-
-        # Generate summary using LLaMA 2 or similar model
         try:
-            prompt = f"Summarize the following news articles into one concise sentence: {combined_text}"
-            response = self.summarizer(prompt, max_length=50, num_return_sequences=1, do_sample=False)
-            return response[0]['generated_text']
+            with stage('takeaway', items=len(articles)):
+                if self.scheduler is not None:
+                    return self.scheduler.run('takeaway', [[article.get('summary') for article in articles]])[0]
+                return self.takeaway.generate(articles)
         except Exception as e:
             print(f"Error generating summary: {e}")
-            return "Unable to generate summary at this time."
+            return FALLBACK_TAKEAWAY
+
+    def _generate_takeaways(self, summary_lists):
+        return [
+            self.takeaway.generate([{'summary': summary} for summary in summaries])
+            for summaries in summary_lists
+        ]
 
     def get_news(self, company_name):
         """
@@ -43,6 +70,18 @@ class NewsController:
         """
         return self.news_service.fetch_news(company_name)
 
+    def get_stored_news(self, company_name, window_seconds, limit=10):
+        """
+        Stored counterpart of get_news plus analyze_sentiment, for companies the feed
+        poller keeps fresh: (articles, sentiment_results) first seen within the window,
+        the top articles picked as get_news picks them. Empty when nothing is stored.
+        """
+        if self.article_store is None:
+            return [], []
+        articles, sentiment_results = self.article_store.window(company_name, window_seconds)
+        top = sorted(range(len(articles)), key=lambda i: len(articles[i].get('topics', [])), reverse=True)[:limit]
+        return [articles[i] for i in top], [sentiment_results[i] for i in top]
+
     def analyze_sentiment(self, articles):
         """
         Analyze the sentiment of the given articles using the sentiment service.
@@ -51,23 +90,22 @@ class NewsController:
 
     def calculate_overall_sentiment(self, sentiment_results):
         """
-        Calculate the overall sentiment based on individual sentiment results.
+        Calculate the overall sentiment based on individual sentiment results
+        (a list of result dicts or an ArticleBatch).
         """
-        if not sentiment_results:
+        if not len(sentiment_results):
             return 'Neutral'
-        
-        # Calculate total sentiment score
-        total_scores = {
-            'positive': 0.0,
-            'negative': 0.0,
-            'neutral': 0.0
-        }
-        
-        for result in sentiment_results:
-            scores = result['scores']
-            for sentiment in total_scores:
-                total_scores[sentiment] += scores[sentiment]
-        
+
+        if not isinstance(sentiment_results, ArticleBatch):
+            sentiment_results = ArticleBatch.from_sentiment_results(sentiment_results)
+
+        # Total sentiment score is a column sum over the [N, 3] score array
+        return self.classify_total_scores(sentiment_results.total_scores())
+
+    def classify_total_scores(self, total_scores):
+        """
+        Classify summed positive/negative/neutral scores into an overall sentiment label.
+        """
         # Calculate total weight
         total_weight = sum(total_scores.values())
         if total_weight > 0:
@@ -86,39 +124,197 @@ class NewsController:
         
         return 'Neutral'
 
-    def compare_articles(self, articles):
+    def _encode_batch(self, texts):
+        return list(self.semantic_model.encode(texts, convert_to_numpy=True))
+
+    def encode_summaries(self, summaries):
+        """
+        Embed summaries with the semantic model as an [N, dim] tensor, reusing cached
+        embeddings and the shared scheduler when they are configured.
+        """
+        if not summaries:
+            return torch.empty(0)
+
+        if self.scheduler is not None:
+            encode = lambda texts: self.scheduler.run('semantic', texts)
+        else:
+            encode = self._encode_batch
+
+        with stage('embed', items=len(summaries)):
+            if self.cache is not None:
+                vectors = self.cache.map(self.backend.cache_id(self.semantic_model_name), summaries, encode)
+            else:
+                vectors = encode(summaries)
+        return torch.from_numpy(np.stack(vectors))
+
+    def compare_articles(self, articles, top_k=None, threshold=None):
         """
         Compare articles using semantic similarity.
+        All pairwise cosine similarities come from one normalized matrix product.
+        Pass top_k to keep only the k most similar pairs and/or threshold to keep
+        pairs at or above that similarity; results are sorted by similarity (descending).
         """
-        comparisons = []
+        if len(articles) < 2:
+            return []
+
         summaries = [article['summary'] for article in articles]
-        embeddings = self.semantic_model.encode(summaries, convert_to_tensor=True)
-
-        for i in range(len(articles)):
-            for j in range(i + 1, len(articles)):
-                similarity = util.pytorch_cos_sim(embeddings[i], embeddings[j]).item()
-                comparison = {
-                    'Article 1': articles[i]['title'],
-                    'Article 2': articles[j]['title'],
-                    'Similarity': round(similarity, 2),
-                    'Impact': f"Article 1 discusses {articles[i]['title']}, while Article 2 focuses on {articles[j]['title']}."
-                }
-                comparisons.append(comparison)
-
-        # Sort comparisons by similarity (descending)
-        comparisons.sort(key=lambda x: x['Similarity'], reverse=True)
+        embeddings = torch.nn.functional.normalize(self.encode_summaries(summaries).float(), dim=1)
+
+        with stage('compare', items=len(articles)):
+            similarity_matrix = embeddings @ embeddings.T
+
+            # Each unordered pair once (upper triangle, i < j)
+            rows, cols = torch.triu_indices(len(articles), len(articles), offset=1)
+            similarities = similarity_matrix[rows, cols]
+
+            if threshold is not None:
+                keep = similarities >= threshold
+                rows, cols, similarities = rows[keep], cols[keep], similarities[keep]
+
+            if top_k is not None and top_k < len(similarities):
+                # Partial selection instead of sorting every pair
+                similarities, order = torch.topk(similarities, top_k)
+            else:
+                similarities, order = torch.sort(similarities, descending=True)
+            rows, cols = rows[order].tolist(), cols[order].tolist()
+
+        # Only build result dicts for the pairs being returned
+        comparisons = []
+        for i, j, similarity in zip(rows, cols, similarities.tolist()):
+            comparisons.append({
+                'Article 1': articles[i]['title'],
+                'Article 2': articles[j]['title'],
+                'Similarity': round(similarity, 2),
+                'Impact': f"Article 1 discusses {articles[i]['title']}, while Article 2 focuses on {articles[j]['title']}."
+            })
         return comparisons
 
     def extract_common_topics(self, articles):
         """
         Extract common topics from the given articles.
         """
-        all_topics = [topic for article in articles for topic in article['topics']]
-        common_topics = [topic for topic, count in Counter(all_topics).items() if count > 1]
-        return common_topics
+        if not isinstance(articles, ArticleBatch):
+            articles = ArticleBatch.from_records(articles)
+        return articles.common_topics(min_count=2)
 
     def convert_text_to_speech(self, text):
         """
         Convert the given text to speech using the TTS service.
         """
-        return self.tts_service.convert_text_to_speech(text)
\ No newline at end of file
+        return self.tts_service.convert_text_to_speech(text)
+
+    def analyze_stream(self, company_name, batch_size=None, window_seconds=None):
+        """
+        Run the full analysis for a company, yielding (event, data) tuples as
+        results become available: 'sources' after fetching, one 'article' per
+        processed article (summary, topics and sentiment), then 'analysis',
+        'takeaway' and finally 'audio'.
+        With window_seconds, articles stored within the window are used when there
+        are any, instead of fetching and processing the sources.
+        """
+        if window_seconds is not None:
+            articles, sentiment_results = self.get_stored_news(company_name, window_seconds)
+            if articles:
+                yield 'sources', {'article_count': len(articles), 'from_store': True}
+                for article, sentiment in zip(articles, sentiment_results):
+                    yield 'article', {'article': article, 'sentiment': sentiment}
+                yield from self._conclude_stream(company_name, articles, sentiment_results, {})
+                return
+
+        collected = self.news_service.collect_articles(company_name)
+        articles = collected['articles']
+        yield 'sources', {
+            'article_count': len(articles),
+            'fetch_latency_ms': collected['fetch_latency_ms'],
+            'duplicates_collapsed': collected['duplicates_collapsed']
+        }
+        if not articles:
+            yield 'error', {'error': 'No news articles found'}
+            return
+
+        # Process in small batches so the first articles are sent after one summary batch
+        batch_size = batch_size or self.news_service.summary_batch_size
+        analyses = []
+        sentiment_by_article = {}
+        for start in range(0, len(articles), batch_size):
+            batch = articles[start:start + batch_size]
+            analyses.extend(self.news_service.process_articles(batch))
+            for article, sentiment in zip(batch, self.analyze_sentiment(batch)):
+                sentiment_by_article[id(article)] = sentiment
+                yield 'article', {'article': article, 'sentiment': sentiment}
+
+        comparative_analysis = self.news_service.finalize_source_topics(collected, analyses)
+        top_articles = self.news_service.select_top_articles(articles)
+        sentiment_results = [sentiment_by_article[id(article)] for article in top_articles]
+        yield from self._conclude_stream(company_name, top_articles, sentiment_results, comparative_analysis)
+
+    def _conclude_stream(self, company_name, top_articles, sentiment_results, comparative_analysis):
+        """
+        The closing 'analysis', 'takeaway' and 'audio' events of analyze_stream.
+        """
+        overall_sentiment = self.calculate_overall_sentiment(sentiment_results)
+        yield 'analysis', {
+            'overall_sentiment': overall_sentiment,
+            'comparative_analysis': comparative_analysis,
+            'coverage_differences': self.compare_articles(top_articles),
+            'common_topics': self.extract_common_topics(top_articles)
+        }
+
+        key_takeaway = self.generate_one_line_summary(top_articles)
+        yield 'takeaway', {'key_takeaway': key_takeaway}
+
+        tts_text = f"The overall sentiment for {company_name} news is {overall_sentiment}. Key insight: {key_takeaway}"
+        yield 'audio', {'audio_file': self.convert_text_to_speech(tts_text)}
+
+    def ingest_new_articles(self, company_name):
+        """
+        Fetch the sources and fully process only articles the article store has not
+        seen yet, then store them. Returns the newly processed articles.
+        """
+        collected = self.news_service.collect_articles(company_name)
+        return self.store_new_articles(company_name, collected['articles'])
+
+    def store_new_articles(self, company_name, articles):
+        """
+        Process and store the given raw articles that are not in the article store yet.
+        """
+        new_articles = self.article_store.filter_new(company_name, articles)
+        if not new_articles:
+            return []
+
+        self.news_service.process_articles(new_articles)
+        sentiment_results = self.analyze_sentiment(new_articles)
+        embeddings = self.encode_summaries([article['summary'] for article in new_articles]).numpy()
+        self.article_store.save(company_name, new_articles, sentiment_results, embeddings)
+        return new_articles
+
+    def analyze_window(self, company_name, window_seconds, refresh=True, article_limit=10):
+        """
+        Sentiment and topic aggregates for a company over a time window, served from
+        the article store. With refresh=True new articles are ingested first, so the
+        model cost depends on how many articles are new, not on the window size.
+        """
+        if self.article_store is None:
+            raise RuntimeError("No article store configured")
+
+        new_articles = self.ingest_new_articles(company_name) if refresh else []
+        # Aggregates are reductions over the window's score and topic columns
+        batch = self.article_store.window_batch(company_name, window_seconds)
+        aggregate = {
+            'article_count': len(batch),
+            'total_scores': batch.total_scores(),
+            'sentiment_counts': {
+                label.capitalize(): count for label, count in batch.sentiment_counts().items() if count
+            },
+            'common_topics': batch.top_topics(10)
+        }
+        articles, sentiment_results = self.article_store.window(company_name, window_seconds, limit=article_limit)
+        return {
+            'company_name': company_name,
+            'window_seconds': window_seconds,
+            'new_articles': len(new_articles),
+            'overall_sentiment': self.classify_total_scores(aggregate['total_scores']),
+            'aggregate': aggregate,
+            'articles': articles,
+            'sentiment_results': sentiment_results
+        }
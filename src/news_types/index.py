@@ -0,0 +1,168 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Column order of every score array; matches SentimentAnalysisService.labels
+SENTIMENT_LABELS = ('negative', 'neutral', 'positive')
+
+
+@dataclass(slots=True)
+class Article:
+    title: str
+    summary: str
+    link: str
+    source: str = ''
+    topics: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class SentimentResult:
+    article: Article
+    sentiment: str
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+class TopicVocabulary:
+    """
+    Interns topic strings to small integer ids, so topic columns are int arrays.
+    """
+    __slots__ = ('ids', 'topics')
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.topics: List[str] = []
+
+    def intern(self, topic: str) -> int:
+        topic_id = self.ids.get(topic)
+        if topic_id is None:
+            topic_id = len(self.topics)
+            self.ids[topic] = topic_id
+            self.topics.append(topic)
+        return topic_id
+
+    def lookup(self, topic_ids) -> List[str]:
+        return [self.topics[topic_id] for topic_id in topic_ids]
+
+
+class ArticleBatch:
+    """
+    Columnar container for many analyzed articles.
+
+    Text fields stay as lists, sentiment scores are an [N, 3] float32 array in
+    SENTIMENT_LABELS order, embeddings an optional [N, dim] float32 array, and
+    topics are interned ids stored CSR-style (`topic_ids` plus `topic_offsets`).
+    Aggregates are numpy reductions over these columns.
+    """
+    __slots__ = ('titles', 'summaries', 'links', 'sources', 'scores', 'embeddings',
+                 'topic_ids', 'topic_offsets', 'vocabulary')
+
+    def __init__(self, titles, summaries, links, sources, scores, topic_ids, topic_offsets,
+                 vocabulary, embeddings=None):
+        self.titles = titles
+        self.summaries = summaries
+        self.links = links
+        self.sources = sources
+        self.scores = scores
+        self.topic_ids = topic_ids
+        self.topic_offsets = topic_offsets
+        self.vocabulary = vocabulary
+        self.embeddings = embeddings
+
+    def __len__(self):
+        return len(self.titles)
+
+    @classmethod
+    def from_records(cls, articles, sentiment_results=None, embeddings=None,
+                     vocabulary: Optional[TopicVocabulary] = None) -> 'ArticleBatch':
+        """
+        Build a batch from article dicts and (optionally) the matching sentiment result dicts.
+        """
+        vocabulary = vocabulary or TopicVocabulary()
+        topic_ids = []
+        topic_offsets = [0]
+        for article in articles:
+            topic_ids.extend(vocabulary.intern(topic) for topic in article.get('topics', []))
+            topic_offsets.append(len(topic_ids))
+
+        if sentiment_results is not None:
+            scores = np.array(
+                [[result['scores'][label] for label in SENTIMENT_LABELS] for result in sentiment_results],
+                dtype=np.float32
+            ).reshape(-1, len(SENTIMENT_LABELS))
+        else:
+            scores = np.zeros((len(articles), len(SENTIMENT_LABELS)), dtype=np.float32)
+
+        return cls(
+            titles=[article.get('title', '') for article in articles],
+            summaries=[article.get('summary', '') for article in articles],
+            links=[article.get('link', '') for article in articles],
+            sources=[article.get('source', '') for article in articles],
+            scores=scores,
+            topic_ids=np.array(topic_ids, dtype=np.int32),
+            topic_offsets=np.array(topic_offsets, dtype=np.int64),
+            vocabulary=vocabulary,
+            embeddings=None if embeddings is None else np.asarray(embeddings, dtype=np.float32)
+        )
+
+    @classmethod
+    def from_sentiment_results(cls, sentiment_results) -> 'ArticleBatch':
+        return cls.from_records(sentiment_results, sentiment_results)
+
+    def total_scores(self) -> Dict[str, float]:
+        totals = self.scores.sum(axis=0, dtype=np.float64)
+        return {label: float(total) for label, total in zip(SENTIMENT_LABELS, totals)}
+
+    def label_ids(self) -> np.ndarray:
+        return self.scores.argmax(axis=1)
+
+    def sentiment_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.label_ids(), minlength=len(SENTIMENT_LABELS)) if len(self) else np.zeros(3, dtype=int)
+        return {label: int(count) for label, count in zip(SENTIMENT_LABELS, counts)}
+
+    def topics_of(self, index) -> List[str]:
+        start, end = self.topic_offsets[index], self.topic_offsets[index + 1]
+        return self.vocabulary.lookup(self.topic_ids[start:end])
+
+    def common_topics(self, min_count=2) -> List[str]:
+        """
+        Topics occurring at least `min_count` times, in order of first occurrence.
+        """
+        if not len(self.topic_ids):
+            return []
+        counts = np.bincount(self.topic_ids)
+        unique_ids, first_positions = np.unique(self.topic_ids, return_index=True)
+        frequent = unique_ids[counts[unique_ids] >= min_count]
+        order = np.argsort(first_positions[np.isin(unique_ids, frequent)], kind='stable')
+        return self.vocabulary.lookup(frequent[order])
+
+    def top_topics(self, limit, min_count=2) -> List[str]:
+        """
+        The `limit` most frequent topics occurring at least `min_count` times, most
+        frequent first (ties in order of first occurrence).
+        """
+        if not len(self.topic_ids):
+            return []
+        counts = np.bincount(self.topic_ids)
+        unique_ids, first_positions = np.unique(self.topic_ids, return_index=True)
+        keep = counts[unique_ids] >= min_count
+        unique_ids, first_positions = unique_ids[keep], first_positions[keep]
+        order = np.lexsort((first_positions, -counts[unique_ids]))[:limit]
+        return self.vocabulary.lookup(unique_ids[order])
+
+
+class ComparativeAnalysis:
+    def __init__(self, articles: List[Article], sentiment_results: Optional[List[SentimentResult]] = None):
+        self.articles = articles
+        self.sentiment_results = sentiment_results or []
+
+    def compare_sentiments(self) -> Dict[str, int]:
+        """
+        Count articles per sentiment label with a single bincount over the score columns.
+        """
+        scores = np.array(
+            [[result.scores.get(label, 0.0) for label in SENTIMENT_LABELS] for result in self.sentiment_results],
+            dtype=np.float32
+        ).reshape(-1, len(SENTIMENT_LABELS))
+        counts = np.bincount(scores.argmax(axis=1), minlength=len(SENTIMENT_LABELS)) if len(scores) else [0, 0, 0]
+        return {label: int(count) for label, count in zip(SENTIMENT_LABELS, counts)}
@@ -0,0 +1,55 @@
+"""
+Model server: loads every model once and serves inference to the app and job
+worker processes over a Unix socket, so their number is bounded by CPU rather
+than by one copy of the models per process.
+
+    MODEL_SERVER_SOCKET=/tmp/news-models.sock python src/serve_models.py
+    MODEL_SERVER_SOCKET=/tmp/news-models.sock python src/app.py
+
+Calls from all clients are merged by one InferenceScheduler (INFERENCE_MAX_WAIT_MS,
+default 5 ms, and INFERENCE_MAX_BATCH). Inference settings such as INFERENCE_BACKEND
+and TAKEAWAY_BACKEND apply here; clients only need MODEL_SERVER_SOCKET and, if set,
+the same MODEL_SERVER_AUTHKEY. Clients ask the server which backend each model runs on
+and key their result caches by it.
+"""
+import os
+from controllers.factory import build_news_controller
+from services.inference_scheduler import InferenceScheduler
+from services.model_server import ModelServer
+
+
+def main():
+    socket_path = os.environ.get('MODEL_SERVER_SOCKET', os.path.join(os.path.dirname(__file__), 'data', 'models.sock'))
+    scheduler = InferenceScheduler(
+        max_batch_size=int(os.environ.get('INFERENCE_MAX_BATCH', 32)),
+        max_wait_ms=float(os.environ.get('INFERENCE_MAX_WAIT_MS', 5))
+    )
+    controller = build_news_controller(scheduler=scheduler)
+
+    # Load everything up front (in the background, requests wait for the models they need)
+    if os.environ.get('WARM_MODELS', '1') == '1':
+        controller.models.warm(background=True)
+
+    server = ModelServer(
+        scheduler,
+        controller.models,
+        socket_path,
+        authkey=os.environ.get('MODEL_SERVER_AUTHKEY', '').encode('utf-8') or None,
+        backends={
+            'summarizer': controller.news_service.backend.name,
+            'sentiment': controller.sentiment_service.backend.name,
+            'semantic': controller.backend.name,
+            'takeaway': getattr(controller.takeaway, 'backend', controller.backend).name
+        }
+    )
+    print(f"Serving models on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
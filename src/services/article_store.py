@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from news_types.index import ArticleBatch, TopicVocabulary, SENTIMENT_LABELS
+
+
+class ArticleStore:
+    """
+    Persistent per-company index of processed articles (SQLite).
+
+    Articles are keyed by company and a hash of their link (or content when there
+    is no link) and keep their summary, topics, sentiment scores and embedding, so
+    each poll only has to process articles it has not seen before. A window is
+    loaded as a columnar ArticleBatch for the sentiment and topic aggregates.
+
+    With a `deduplicator` (dedup.ArticleDeduplicator) each article's title hash and
+    SimHash are stored too, and near-duplicates of articles stored within the last
+    `dedup_window_seconds` are not processed again, whichever source they came from.
+    """
+
+    def __init__(self, db_path, deduplicator=None, dedup_window_seconds=48 * 3600):
+        self.db_path = db_path
+        self.deduplicator = deduplicator
+        self.dedup_window_seconds = dedup_window_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS articles ('
+                'company TEXT NOT NULL, article_key TEXT NOT NULL, first_seen REAL NOT NULL, '
+                'title TEXT, link TEXT, source TEXT, summary TEXT, topics TEXT, sentiment TEXT, '
+                'positive REAL, neutral REAL, negative REAL, embedding BLOB, article TEXT, '
+                'PRIMARY KEY (company, article_key))'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS articles_window ON articles (company, first_seen)')
+            # Article databases created before near-duplicate fingerprints were stored
+            columns = {row[1] for row in self._db.execute('PRAGMA table_info(articles)')}
+            if 'title_hash' not in columns:
+                self._db.execute('ALTER TABLE articles ADD COLUMN title_hash TEXT')
+            if 'simhash' not in columns:
+                self._db.execute('ALTER TABLE articles ADD COLUMN simhash TEXT')
+
+    @staticmethod
+    def company_key(company_name):
+        return ' '.join(company_name.lower().split())
+
+    @staticmethod
+    def article_key(article):
+        basis = article.get('link') or f"{article.get('title', '')}\0{article.get('full_summary', '')}"
+        return hashlib.sha256(basis.encode('utf-8')).hexdigest()
+
+    def filter_new(self, company_name, articles):
+        """
+        Return the articles that are not stored yet for this company.
+        Near-duplicates of recently stored articles are dropped as well; their source,
+        title and link are added to the stored article's 'also_reported_by'.
+        """
+        company = self.company_key(company_name)
+        keys = [self.article_key(article) for article in articles]
+        seen = set()
+        with self._lock:
+            # Query in chunks to stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._db.execute(
+                    f'SELECT article_key FROM articles WHERE company = ? AND article_key IN ({placeholders})',
+                    [company] + chunk
+                ).fetchall()
+                seen.update(row[0] for row in rows)
+        articles = [article for article, key in zip(articles, keys) if key not in seen]
+        if self.deduplicator is None or not articles:
+            return articles
+        return self._drop_stored_duplicates(company, articles)
+
+    def _drop_stored_duplicates(self, company, articles):
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT article_key, title_hash, simhash FROM articles '
+                'WHERE company = ? AND first_seen >= ? AND title_hash IS NOT NULL',
+                (company, time.time() - self.dedup_window_seconds)
+            ).fetchall()
+        known = {key: (title_key, int(simhash, 16) if simhash else None) for key, title_key, simhash in rows}
+        matches = self.deduplicator.match(articles, known)
+
+        reported_by = {}
+        for article, key in zip(articles, matches):
+            if key is not None:
+                reported_by.setdefault(key, []).append(
+                    {'source': article.get('source'), 'title': article.get('title'), 'link': article.get('link')}
+                )
+        if reported_by:
+            with self._lock, self._db:
+                for key, others in reported_by.items():
+                    row = self._db.execute(
+                        'SELECT article FROM articles WHERE company = ? AND article_key = ?', (company, key)
+                    ).fetchone()
+                    stored = json.loads(row[0])
+                    also_reported_by = stored.setdefault('also_reported_by', [])
+                    links = {other.get('link') for other in also_reported_by} | {stored.get('link')}
+                    also_reported_by.extend(other for other in others if other['link'] not in links)
+                    self._db.execute(
+                        'UPDATE articles SET article = ? WHERE company = ? AND article_key = ?',
+                        (json.dumps(stored), company, key)
+                    )
+        return [article for article, key in zip(articles, matches) if key is None]
+
+    def save(self, company_name, articles, sentiment_results, embeddings=None):
+        """
+        Store processed articles with their sentiment results and (optional) embeddings.
+        """
+        company = self.company_key(company_name)
+        now = time.time()
+        rows = []
+        for index, (article, sentiment) in enumerate(zip(articles, sentiment_results)):
+            key = self.article_key(article)
+            embedding = None
+            if embeddings is not None and len(embeddings) > index:
+                embedding = np.asarray(embeddings[index], dtype=np.float32).tobytes()
+            title_key, simhash = self.deduplicator.fingerprint(article) if self.deduplicator else (None, None)
+            scores = sentiment['scores']
+            rows.append((
+                company, key, now, article.get('title'), article.get('link'), article.get('source'),
+                article.get('summary'), json.dumps(article.get('topics', [])), sentiment['sentiment'],
+                scores['positive'], scores['neutral'], scores['negative'], embedding, json.dumps(article),
+                title_key, f'{simhash:016x}' if simhash is not None else None
+            ))
+
+        with self._lock, self._db:
+            self._db.executemany(
+                'INSERT OR IGNORE INTO articles (company, article_key, first_seen, title, link, source, summary, '
+                'topics, sentiment, positive, neutral, negative, embedding, article, title_hash, simhash) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def window(self, company_name, window_seconds, limit=None):
+        """
+        Return (articles, sentiment_results) first seen within the window, newest first.
+        """
+        company = self.company_key(company_name)
+        query = (
+            'SELECT article, sentiment, positive, neutral, negative FROM articles '
+            'WHERE company = ? AND first_seen >= ? ORDER BY first_seen DESC'
+        )
+        params = [company, time.time() - window_seconds]
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+
+        articles = []
+        sentiment_results = []
+        for article_json, sentiment, positive, neutral, negative in rows:
+            article = json.loads(article_json)
+            articles.append(article)
+            sentiment_results.append({
+                'title': article.get('title'),
+                'summary': article.get('summary'),
+                'sentiment': sentiment,
+                'scores': {'positive': positive, 'neutral': neutral, 'negative': negative}
+            })
+        return articles, sentiment_results
+
+    def window_batch(self, company_name, window_seconds):
+        """
+        Load the window as a columnar ArticleBatch (scores, embeddings and interned
+        topic ids as numpy arrays) without materializing per-article dicts.
+        """
+        company = self.company_key(company_name)
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT title, summary, link, source, topics, negative, neutral, positive, embedding '
+                'FROM articles WHERE company = ? AND first_seen >= ? ORDER BY first_seen DESC',
+                (company, time.time() - window_seconds)
+            ).fetchall()
+
+        vocabulary = TopicVocabulary()
+        topic_ids = []
+        topic_offsets = [0]
+        scores = np.empty((len(rows), len(SENTIMENT_LABELS)), dtype=np.float32)
+        vectors = []
+        for index, row in enumerate(rows):
+            topic_ids.extend(vocabulary.intern(topic) for topic in json.loads(row[4] or '[]'))
+            topic_offsets.append(len(topic_ids))
+            scores[index] = row[5:8]
+            if row[8] is not None:
+                vectors.append(np.frombuffer(row[8], dtype=np.float32))
+
+        return ArticleBatch(
+            titles=[row[0] for row in rows],
+            summaries=[row[1] for row in rows],
+            links=[row[2] for row in rows],
+            sources=[row[3] for row in rows],
+            scores=scores,
+            topic_ids=np.array(topic_ids, dtype=np.int32),
+            topic_offsets=np.array(topic_offsets, dtype=np.int64),
+            vocabulary=vocabulary,
+            embeddings=np.stack(vectors) if vectors and len(vectors) == len(rows) else None
+        )
@@ -0,0 +1,164 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+class AudioStore:
+    """
+    Bounded store for generated MP3 files under the static folder.
+
+    Files are named by content hash and sharded into subdirectories by the first
+    hash characters (audio/ab/abcdef....mp3). A SQLite index kept outside the
+    served folder (data/audio_index.db beside it by default) tracks size and last
+    access, so requests never have to stat the directory and every process serving
+    the same folder (app and job workers) shares one size and age budget, enforced
+    by evicting the least recently used files.
+    """
+
+    def __init__(self, static_folder, subdir='audio', max_bytes=256 * 1024 * 1024,
+                 max_age_seconds=7 * 24 * 3600, shard_chars=2, index_path=None):
+        self.static_folder = static_folder
+        self.subdir = subdir
+        self.root = os.path.join(static_folder, subdir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.shard_chars = shard_chars
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+        # Everything under the static folder is served, so the index defaults to a data folder beside it
+        index_path = index_path or os.path.join(
+            os.path.dirname(os.path.abspath(static_folder)), 'data', f'{subdir}_index.db'
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        # Autocommit, with explicit transactions where several statements must see the same state
+        self._db = sqlite3.connect(index_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS files_last_access ON files (last_access)')
+        self.rebuild_index()
+
+    def relative_path(self, key):
+        """
+        Path relative to the static folder, suitable for url_for('static', filename=...).
+        """
+        return f"{self.subdir}/{key[:self.shard_chars]}/{key}.mp3"
+
+    def _absolute_path(self, relative_path):
+        return os.path.join(self.static_folder, *relative_path.split('/'))
+
+    def rebuild_index(self):
+        """
+        Scan the shard directories once and bring the index in line with the files on
+        disk: files it does not know are added with their mtime, missing files dropped.
+        """
+        files = {}
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and entry.name.endswith('.mp3'):
+                    stat = entry.stat()
+                    files[f"{self.subdir}/{shard.name}/{entry.name}"] = (stat.st_size, stat.st_mtime)
+
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                indexed = {row[0] for row in self._db.execute('SELECT path FROM files')}
+                self._db.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in indexed - files.keys()])
+                self._db.executemany(
+                    'INSERT INTO files (path, size, last_access) VALUES (?, ?, ?)',
+                    [(path, *files[path]) for path in files.keys() - indexed]
+                )
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+        self.evict()
+
+    def get(self, key):
+        """
+        Return the stored file's relative path for `key`, or None if it is not stored.
+        """
+        relative_path = self.relative_path(key)
+        with self._lock:
+            row = self._db.execute('SELECT last_access FROM files WHERE path = ?', (relative_path,)).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[0] > self.max_age_seconds:
+                return None
+            # Another process may have evicted the file since the index was read
+            if not os.path.exists(self._absolute_path(relative_path)):
+                self._db.execute('DELETE FROM files WHERE path = ?', (relative_path,))
+                return None
+            self._db.execute('UPDATE files SET last_access = ? WHERE path = ?', (time.time(), relative_path))
+        return relative_path
+
+    def put(self, key, data):
+        """
+        Store MP3 bytes under `key` and return the relative path.
+        """
+        relative_path = self.relative_path(key)
+        filepath = self._absolute_path(relative_path)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial MP3
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, filepath)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO files (path, size, last_access) VALUES (?, ?, ?)',
+                (relative_path, len(data), time.time())
+            )
+        self.evict()
+        return relative_path
+
+    def evict(self):
+        """
+        Drop files older than the age budget, then least recently used files until
+        the total size of all processes' files fits the size budget.
+        """
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                cutoff = time.time() - self.max_age_seconds
+                doomed = [row[0] for row in self._db.execute('SELECT path FROM files WHERE last_access < ?', (cutoff,))]
+                self._db.execute('DELETE FROM files WHERE last_access < ?', (cutoff,))
+                # Keep the most recent file even if it alone exceeds the budget
+                over_budget = [row[0] for row in self._db.execute(
+                    'SELECT path FROM ('
+                    ' SELECT path, SUM(size) OVER (ORDER BY last_access DESC, path) AS running_total,'
+                    ' ROW_NUMBER() OVER (ORDER BY last_access DESC, path) AS position FROM files'
+                    ') WHERE running_total > ? AND position > 1',
+                    (self.max_bytes,)
+                )]
+                self._db.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in over_budget])
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+            doomed.extend(over_budget)
+
+        for relative_path in doomed:
+            try:
+                os.remove(self._absolute_path(relative_path))
+            except FileNotFoundError:
+                pass
+        return len(doomed)
+
+    def stats(self):
+        with self._lock:
+            files, total_bytes = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files').fetchone()
+        return {'files': files, 'bytes': total_bytes, 'max_bytes': self.max_bytes}
@@ -0,0 +1,157 @@
+import hashlib
+import re
+
+
+class ArticleDeduplicator:
+    """
+    Collapses near-duplicate articles (syndicated wire stories) before they reach the models.
+
+    Two articles are treated as the same story when their normalized titles hash
+    the same, or when the SimHash fingerprints of their `full_summary` shingles
+    differ in at most `max_distance` bits. Candidate pairs are found by banding
+    the 64-bit fingerprint, so clustering stays close to linear in the article count.
+    """
+
+    def __init__(self, max_distance=3, shingle_size=3):
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        # With max_distance + 1 bands, two fingerprints within max_distance bits share a band
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+
+    def normalize_title(self, title):
+        title = title.lower()
+        # Drop a trailing " - Publisher" suffix that Google News appends
+        title = re.sub(r'\s+-\s+[^-]+$', '', title)
+        title = re.sub(r'[^\w\s]', '', title)
+        return re.sub(r'\s+', ' ', title).strip()
+
+    def title_hash(self, title):
+        return hashlib.blake2b(self.normalize_title(title).encode('utf-8'), digest_size=8).hexdigest()
+
+    def simhash(self, text):
+        words = re.findall(r'\w+', text.lower())
+        if len(words) < self.shingle_size:
+            shingles = [' '.join(words)] if words else []
+        else:
+            shingles = [' '.join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)]
+
+        weights = [0] * 64
+        for shingle in shingles:
+            value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            for bit in range(64):
+                weights[bit] += 1 if value >> bit & 1 else -1
+
+        fingerprint = 0
+        for bit, weight in enumerate(weights):
+            if weight > 0:
+                fingerprint |= 1 << bit
+        return fingerprint
+
+    def fingerprint(self, article):
+        """
+        (title hash, SimHash of `full_summary` or None) of one article, as stored by ArticleStore.
+        """
+        summary = article.get('full_summary', '')
+        return self.title_hash(article.get('title', '')), self.simhash(summary) if summary else None
+
+    def match(self, articles, known):
+        """
+        Find articles that duplicate already known ones.
+        `known` maps a key to a (title hash, simhash) fingerprint; returns, for each
+        article, the key of a known near-duplicate or None.
+        """
+        by_title = {}
+        by_band = {}
+        for key, (title_key, fingerprint) in known.items():
+            by_title.setdefault(title_key, key)
+            if fingerprint is not None:
+                for band_key in self._bands(fingerprint):
+                    by_band.setdefault(band_key, []).append((key, fingerprint))
+
+        matches = []
+        for article in articles:
+            title_key, fingerprint = self.fingerprint(article)
+            match = by_title.get(title_key)
+            if match is None and fingerprint is not None:
+                for band_key in self._bands(fingerprint):
+                    match = next(
+                        (key for key, other in by_band.get(band_key, [])
+                         if bin(fingerprint ^ other).count('1') <= self.max_distance),
+                        None
+                    )
+                    if match is not None:
+                        break
+            matches.append(match)
+        return matches
+
+    def _bands(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def cluster(self, articles):
+        """
+        Group near-duplicate articles.
+        Returns a list of clusters (lists of indices into `articles`), ordered by
+        their first member.
+        """
+        parent = list(range(len(articles)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i, j):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        fingerprints = []
+        by_title = {}
+        by_band = {}
+        for i, article in enumerate(articles):
+            title_key, fingerprint = self.fingerprint(article)
+            if title_key in by_title:
+                union(i, by_title[title_key])
+            else:
+                by_title[title_key] = i
+
+            fingerprints.append(fingerprint)
+            if fingerprint is None:
+                continue
+            for band_key in self._bands(fingerprint):
+                for j in by_band.get(band_key, []):
+                    if bin(fingerprint ^ fingerprints[j]).count('1') <= self.max_distance:
+                        union(i, j)
+                by_band.setdefault(band_key, []).append(i)
+
+        clusters = {}
+        for i in range(len(articles)):
+            clusters.setdefault(find(i), []).append(i)
+        return list(clusters.values())
+
+    def collapse(self, articles, clusters=None):
+        """
+        Return one representative per cluster of near-duplicates, in original order.
+        The representative is the article with the longest `full_summary`; it gets
+        an 'also_reported_by' list with the source, title and link of the others.
+        """
+        if clusters is None:
+            clusters = self.cluster(articles)
+
+        representatives = []
+        for members in clusters:
+            best = max(members, key=lambda i: len(articles[i].get('full_summary', '')))
+            representative = articles[best]
+            representative['also_reported_by'] = [
+                {
+                    'source': articles[i].get('source'),
+                    'title': articles[i].get('title'),
+                    'link': articles[i].get('link')
+                }
+                for i in members if i != best
+            ]
+            representatives.append(representative)
+        return representatives
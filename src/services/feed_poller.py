@@ -0,0 +1,146 @@
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FeedPoller:
+    """
+    Polls the news sources for a watchlist of companies in the background.
+
+    Every (company, source) pair is scheduled on its own interval (per source
+    host, with random jitter) and new articles are run through the normal
+    summarize/sentiment/topic stages and saved to the article store ahead of
+    time. A semaphore per host bounds concurrent requests to it, and failures
+    put the host into exponential backoff (honouring Retry-After on 429/503).
+    """
+
+    def __init__(self, controller, watchlist, intervals=None, default_interval=900, jitter=0.2,
+                 per_host_concurrency=2, max_backoff=3600, workers=4):
+        self.controller = controller
+        self.news_service = controller.news_service
+        self.watchlist = [company.strip() for company in watchlist if company.strip()]
+        self.intervals = intervals or {}
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self.per_host_concurrency = per_host_concurrency
+        self.max_backoff = max_backoff
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='feed-poll')
+
+        self._schedule = []  # heap of (due_time, company, source_index)
+        self._host_limits = {}
+        self._backoff = {}  # host -> (consecutive_failures, retry_at)
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        # Updated from the pool threads; read through stats_snapshot()
+        self.stats = {'polls': 0, 'errors': 0, 'processing_errors': 0, 'new_articles': 0, 'last_poll': {}}
+        self._stats_lock = threading.Lock()
+
+    def _host(self, source):
+        return source['url'].split('/')[2]
+
+    def _interval(self, source):
+        interval = self.intervals.get(self._host(source), self.default_interval)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def is_watched(self, company_name):
+        key = company_name.strip().lower()
+        return any(company.lower() == key for company in self.watchlist)
+
+    def stats_snapshot(self):
+        with self._stats_lock:
+            return {**self.stats, 'last_poll': dict(self.stats['last_poll'])}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        now = time.time()
+        with self._condition:
+            for company in self.watchlist:
+                for index, source in enumerate(self.news_service.news_sources):
+                    self._host_limits.setdefault(self._host(source), threading.BoundedSemaphore(self.per_host_concurrency))
+                    # Spread the first polls over one interval so they do not all fire at once
+                    heapq.heappush(self._schedule, (now + random.uniform(0, self._interval(source)), company, index))
+        self._thread = threading.Thread(target=self._run, name='feed-poller', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def _reschedule(self, due_time, company, index):
+        with self._condition:
+            heapq.heappush(self._schedule, (due_time, company, index))
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._schedule and self._schedule[0][0] <= time.time():
+                        break
+                    timeout = self._schedule[0][0] - time.time() if self._schedule else None
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+                _, company, index = heapq.heappop(self._schedule)
+
+            source = self.news_service.news_sources[index]
+            host = self._host(source)
+            _, retry_at = self._backoff.get(host, (0, 0))
+            if retry_at > time.time():
+                self._reschedule(retry_at + random.uniform(0, 5), company, index)
+                continue
+            self.executor.submit(self._poll, company, index)
+
+    def _poll(self, company, index):
+        source = self.news_service.news_sources[index]
+        host = self._host(source)
+        try:
+            try:
+                with self._host_limits[host]:
+                    articles = self.news_service.fetch_source(source, company, raise_errors=True)
+            except Exception as e:
+                # Only fetch failures say anything about the host
+                with self._stats_lock:
+                    self.stats['errors'] += 1
+                print(f"Error polling {host} for {company}: {e}")
+                self._back_off(host, e)
+                return
+            self._backoff.pop(host, None)
+
+            for article in articles:
+                article['source_type'] = source['type']
+            if self.news_service.deduplicator is not None:
+                articles = self.news_service.deduplicator.collapse(articles)
+            # Copies of stories already stored from other sources are dropped by the store
+            new_articles = self.controller.store_new_articles(company, articles)
+
+            with self._stats_lock:
+                self.stats['polls'] += 1
+                self.stats['new_articles'] += len(new_articles)
+                self.stats['last_poll'][f"{company}@{host}"] = time.time()
+        except Exception as e:
+            # Model or storage failures; the host served the feed fine, so it is not backed off
+            with self._stats_lock:
+                self.stats['processing_errors'] += 1
+            print(f"Error processing articles from {host} for {company}: {e}")
+        finally:
+            self._reschedule(time.time() + self._interval(source), company, index)
+
+    def _back_off(self, host, error):
+        failures, _ = self._backoff.get(host, (0, 0))
+        failures += 1
+        delay = min(self.max_backoff, 30 * 2 ** (failures - 1))
+
+        # Respect the server's own hint when it rate-limits us
+        response = getattr(error, 'response', None)
+        if response is not None and response.status_code in (429, 503):
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+
+        self._backoff[host] = (failures, time.time() + delay * random.uniform(1, 1 + self.jitter))
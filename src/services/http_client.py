@@ -0,0 +1,119 @@
+import copy
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpClient:
+    """
+    Shared HTTP client for the news sources.
+
+    Keeps a pooled keep-alive session per host and remembers ETag/Last-Modified
+    validators per URL, so repeated fetches send conditional requests and a
+    304 Not Modified reuses the previously parsed result.
+    """
+
+    def __init__(self, headers=None, timeout=10, pool_connections=10, pool_maxsize=10, max_entries=512,
+                 drain_limit=256 * 1024):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        # A streamed body stopped early is read to the end when at most this many bytes are
+        # left, so the keep-alive connection can be reused; larger rests drop the connection
+        self.drain_limit = drain_limit
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        # url -> {'etag', 'last_modified', 'parsed'}, least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'bytes': 0}
+
+    def _lookup(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def _store(self, url, entry):
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def fetch(self, url, parse, timeout=None, stream=False):
+        """
+        GET `url` and return `parse(response)`.
+        If the server answers 304 Not Modified, the result parsed from the last
+        full response is returned instead (as a copy, so callers may mutate it).
+        With stream=True the body is not preloaded, so `parse` can read it
+        incrementally (response.iter_content) and stop early.
+        """
+        entry = self._lookup(url)
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, headers=headers, timeout=timeout or self.timeout, stream=stream)
+        not_modified = response.status_code == 304 and entry is not None
+        try:
+            if not_modified:
+                return copy.deepcopy(entry['parsed'])
+
+            response.raise_for_status()
+            parsed = parse(response)
+        finally:
+            if stream:
+                self._drain(response)
+            received = response.raw.tell() if stream else len(response.content)
+            response.close()
+            with self._lock:
+                self.stats['requests'] += 1
+                if not_modified:
+                    self.stats['not_modified'] += 1
+                else:
+                    self.stats['bytes'] += received
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._store(url, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'parsed': copy.deepcopy(parsed)
+            })
+        return parsed
+
+    def _drain(self, response):
+        """
+        Read the unread rest of a streamed body if it is small. A response read to
+        the end returns its connection to the pool; closing it early closes the connection.
+        """
+        raw = response.raw
+        length = response.headers.get('Content-Length', '')
+        if length.isdigit() and int(length) - raw.tell() > self.drain_limit:
+            return
+        # Without a Content-Length (chunked), read up to the limit and give up after it
+        try:
+            drained = 0
+            while drained <= self.drain_limit:
+                chunk = raw.read(16384, decode_content=False)
+                if not chunk:
+                    return
+                drained += len(chunk)
+        except Exception:
+            pass  # The connection is closed with the response either way
+
+    def close(self):
+        self.session.close()
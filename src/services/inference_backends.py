@@ -0,0 +1,202 @@
+import os
+
+import torch
+from transformers import (
+    AutoTokenizer,
+    AutoModelForSeq2SeqLM,
+    AutoModelForSequenceClassification,
+    AutoModelForCausalLM,
+    pipeline
+)
+
+
+class InferenceBackend:
+    """
+    Loads the transformer models in a particular runtime.
+
+    Each loader returns objects with the same interface the services already use:
+    a transformers pipeline for summarization and text generation, a (tokenizer,
+    model) pair for classification whose model returns `.logits`, and an object
+    with SentenceTransformer's encode() for embeddings.
+    """
+    name = 'base'
+
+    def cache_id(self, model_name):
+        """
+        Result cache id for a model's outputs; backends that change the numbers get their own.
+        """
+        return model_name if self.name == 'pytorch' else f"{model_name}+{self.name}"
+
+    def load_summarizer(self, model_name):
+        raise NotImplementedError
+
+    def load_classifier(self, model_name):
+        raise NotImplementedError
+
+    def load_text_generator(self, model_name, **kwargs):
+        raise NotImplementedError
+
+    def load_sentence_encoder(self, model_name):
+        raise NotImplementedError
+
+
+class PyTorchBackend(InferenceBackend):
+    """
+    Full-precision PyTorch eager models (the original behaviour).
+    intra_op_threads/inter_op_threads are applied to torch, which is process wide.
+    """
+    name = 'pytorch'
+    # Large causal LMs are spread over the available devices by accelerate
+    device_map = 'auto'
+
+    def __init__(self, intra_op_threads=None, inter_op_threads=None):
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        if intra_op_threads:
+            torch.set_num_threads(intra_op_threads)
+        if inter_op_threads:
+            try:
+                torch.set_num_interop_threads(inter_op_threads)
+            except RuntimeError as e:
+                # Only allowed before torch has started any parallel work
+                print(f"Could not set inter-op threads: {e}")
+
+    def prepare(self, model):
+        model.eval()
+        return model
+
+    def load_summarizer(self, model_name):
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = self.prepare(AutoModelForSeq2SeqLM.from_pretrained(model_name))
+        return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+    def load_classifier(self, model_name):
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = self.prepare(AutoModelForSequenceClassification.from_pretrained(model_name))
+        return tokenizer, model
+
+    def load_text_generator(self, model_name, **kwargs):
+        tokenizer = AutoTokenizer.from_pretrained(model_name, **kwargs)
+        if self.device_map:
+            kwargs['device_map'] = self.device_map
+        model = self.prepare(AutoModelForCausalLM.from_pretrained(model_name, **kwargs))
+        return pipeline("text-generation", model=model, tokenizer=tokenizer)
+
+    def load_sentence_encoder(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        return self.prepare(SentenceTransformer(model_name))
+
+
+class QuantizedPyTorchBackend(PyTorchBackend):
+    """
+    PyTorch models with their Linear layers dynamically quantized to int8.
+    Weights are stored as int8 and activations are quantized per batch at run time,
+    which roughly quarters the weight memory and speeds up the matmuls on CPU.
+    """
+    name = 'int8'
+    # Dynamic quantization runs on CPU only
+    device_map = None
+
+    def prepare(self, model):
+        model.eval()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class ONNXRuntimeBackend(InferenceBackend):
+    """
+    Models exported to ONNX and run by ONNX Runtime (through optimum), with tunable
+    intra-/inter-op thread pools per session. Exports are written to export_dir
+    and reused on the next start.
+    """
+    name = 'onnx'
+
+    def __init__(self, intra_op_threads=None, inter_op_threads=None, export_dir=None,
+                 provider='CPUExecutionProvider'):
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.export_dir = export_dir
+        self.provider = provider
+
+    def session_options(self):
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        if self.inter_op_threads:
+            options.inter_op_num_threads = self.inter_op_threads
+            options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+        return options
+
+    def _load(self, model_class, model_name, **kwargs):
+        """
+        Load a previously exported model from export_dir, or export it from the checkpoint.
+        """
+        export_path = os.path.join(self.export_dir, model_name.replace('/', '--')) if self.export_dir else None
+        options = dict(session_options=self.session_options(), provider=self.provider)
+        if export_path and os.path.isdir(export_path):
+            return model_class.from_pretrained(export_path, **options), export_path
+
+        model = model_class.from_pretrained(model_name, export=True, **options, **kwargs)
+        if export_path:
+            model.save_pretrained(export_path)
+        return model, export_path
+
+    def load_summarizer(self, model_name):
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        model, _ = self._load(ORTModelForSeq2SeqLM, model_name)
+        return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+    def load_classifier(self, model_name):
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        model, _ = self._load(ORTModelForSequenceClassification, model_name)
+        return AutoTokenizer.from_pretrained(model_name), model
+
+    def load_text_generator(self, model_name, **kwargs):
+        from optimum.onnxruntime import ORTModelForCausalLM
+        model, _ = self._load(ORTModelForCausalLM, model_name, **kwargs)
+        return pipeline("text-generation", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name, **kwargs))
+
+    def load_sentence_encoder(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        # sentence-transformers runs its own ONNX export (or uses the one published with the model)
+        return SentenceTransformer(model_name, backend='onnx', model_kwargs={
+            'provider': self.provider,
+            'session_options': self.session_options()
+        })
+
+
+INFERENCE_BACKENDS = ('pytorch', 'int8', 'onnx')
+
+
+class RemoteBackend(InferenceBackend):
+    """
+    Backend of a model that runs in the model server (model_server.py). Nothing is
+    loaded in this process; its name, and so its cache_id, is the one the server reports.
+    """
+
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+
+    @property
+    def name(self):
+        return self.client.backend_name(self.model)
+
+    def _load(self, model_name, *args, **kwargs):
+        raise RuntimeError(f"'{model_name}' runs in the model server and is not loaded by its clients")
+
+    load_summarizer = load_classifier = load_text_generator = load_sentence_encoder = _load
+
+
+def create_inference_backend(name, intra_op_threads=None, inter_op_threads=None, export_dir=None):
+    """
+    Build the inference backend selected by name.
+    """
+    if name == 'pytorch':
+        return PyTorchBackend(intra_op_threads, inter_op_threads)
+    if name == 'int8':
+        return QuantizedPyTorchBackend(intra_op_threads, inter_op_threads)
+    if name == 'onnx':
+        return ONNXRuntimeBackend(intra_op_threads, inter_op_threads, export_dir=export_dir)
+    raise ValueError(f"Unknown inference backend '{name}', expected one of {', '.join(INFERENCE_BACKENDS)}")
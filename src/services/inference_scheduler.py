@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+
+from services.metrics import METRICS
+
+
+class _PendingRequest:
+    def __init__(self, items):
+        self.items = items
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects inference requests from concurrent callers and runs them as one batch.
+
+    The first request waits at most `max_wait_ms` for others to arrive; the batch
+    is dispatched as soon as it holds `max_batch_size` items or the wait expires.
+    `batch_fn` takes a list of items and returns one result per item.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size=32, max_wait_ms=5):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._carry = None
+        self._thread = threading.Thread(target=self._run, name=f'batcher-{name}', daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        """
+        Run `items` through the model together with other callers' items; blocks until done.
+        """
+        items = list(items)
+        if not items:
+            return []
+        request = _PendingRequest(items)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def _collect(self):
+        first = self._carry or self._queue.get()
+        self._carry = None
+        batch = [first]
+        size = len(first.items)
+        deadline = first.enqueued_at + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(request.items) > self.max_batch_size:
+                # Keep it for the next batch rather than overflowing this one
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request.items)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            items = [item for request in batch for item in request.items]
+            METRICS.observe('model_batch_size', len(items), model=f'{self.name}_scheduled')
+            for request in batch:
+                METRICS.observe('inference_queue_wait_seconds', started - request.enqueued_at, model=self.name)
+
+            try:
+                results = self.batch_fn(items)
+                offset = 0
+                for request in batch:
+                    request.results = list(results[offset:offset + len(request.items)])
+                    offset += len(request.items)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            for request in batch:
+                request.done.set()
+
+    def stats(self):
+        return {
+            'batch_size': METRICS.snapshot('model_batch_size', model=f'{self.name}_scheduled'),
+            'queue_wait_seconds': METRICS.snapshot('inference_queue_wait_seconds', model=self.name)
+        }
+
+
+class InferenceScheduler:
+    """
+    Shared registry of MicroBatchers, one per model, used by all in-flight analyses.
+    """
+
+    def __init__(self, max_batch_size=32, max_wait_ms=5):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._batchers = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, batch_fn, max_batch_size=None):
+        with self._lock:
+            if name not in self._batchers:
+                self._batchers[name] = MicroBatcher(
+                    name,
+                    batch_fn,
+                    max_batch_size=max_batch_size or self.max_batch_size,
+                    max_wait_ms=self.max_wait_ms
+                )
+
+    def run(self, name, items):
+        return self._batchers[name].submit(items)
+
+    def stats(self):
+        return {name: batcher.stats() for name, batcher in self._batchers.items()}
@@ -0,0 +1,353 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the queue is at capacity.
+    """
+
+
+class LeaseLostError(Exception):
+    """
+    Raised when a worker writes to a job it no longer holds, because its lease
+    expired and the job was claimed again (or finished) in the meantime.
+    """
+
+
+class JobBroker:
+    """
+    Interface for the analysis job queue.
+
+    A broker stores jobs and their progress so that the web process can submit
+    and poll them while worker processes claim and run them. Implementations must
+    be safe to use from several processes at once.
+    """
+
+    def submit(self, payload):
+        raise NotImplementedError
+
+    def claim(self):
+        """
+        Atomically take the oldest queued job; returns (job_id, payload, attempt) or None.
+        The claim is a lease: a job whose lease runs out (its worker died) is queued again
+        and its progress events are discarded, so the next attempt starts from scratch.
+        """
+        raise NotImplementedError
+
+    def renew(self, job_id, attempt):
+        """
+        Extend the lease on a running job; workers call this while the job runs.
+        """
+        raise NotImplementedError
+
+    def add_event(self, job_id, attempt, event, data):
+        """
+        Record a progress event; raises LeaseLostError if `attempt` no longer holds the job.
+        """
+        raise NotImplementedError
+
+    def complete(self, job_id, attempt, result):
+        raise NotImplementedError
+
+    def fail(self, job_id, attempt, error):
+        raise NotImplementedError
+
+    def get(self, job_id, since=0):
+        """
+        Return the job status, attempt, result/error and progress events from index
+        `since`, or None.
+        """
+        raise NotImplementedError
+
+    def pending_count(self):
+        raise NotImplementedError
+
+
+class SQLiteJobBroker(JobBroker):
+    """
+    Job broker backed by a local SQLite file, so it needs no external services.
+    Running jobs hold a lease of `lease_seconds`; a job whose lease expires is queued
+    again, up to `max_attempts` runs in total, after which it is marked failed.
+    """
+
+    def __init__(self, db_path, max_pending=100, lease_seconds=120, max_attempts=3):
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, '
+                'result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS job_events ('
+                'job_id TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL, data TEXT NOT NULL, '
+                'PRIMARY KEY (job_id, seq))'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)')
+            # Job databases created before leases were added
+            columns = {row[1] for row in db.execute('PRAGMA table_info(jobs)')}
+            if 'lease_expires' not in columns:
+                db.execute('ALTER TABLE jobs ADD COLUMN lease_expires REAL')
+            if 'attempts' not in columns:
+                db.execute('ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0')
+
+    def _connect(self, immediate=True):
+        # One connection per thread (and per process, since workers build their own broker)
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+        return _Transaction(db, immediate)
+
+    def submit(self, payload):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            pending = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({pending} pending)")
+            db.execute(
+                "INSERT INTO jobs (id, status, payload, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(payload), now, now)
+            )
+        return job_id
+
+    def claim(self):
+        now = time.time()
+        with self._connect() as db:
+            # Jobs of workers that died (or hung) without finishing go back to the queue
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Worker lost the job too many times', updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            db.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running' AND lease_expires < ?",
+                (now, now)
+            )
+            row = db.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            # Progress of an earlier attempt would be replayed ahead of this run's events
+            db.execute('DELETE FROM job_events WHERE job_id = ?', (row[0],))
+            db.execute(
+                "UPDATE jobs SET status = 'running', lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                (now + self.lease_seconds, now, row[0])
+            )
+        return row[0], json.loads(row[1]), row[2] + 1
+
+    def _holds(self, db, job_id, attempt):
+        row = db.execute(
+            "SELECT 1 FROM jobs WHERE id = ? AND status = 'running' AND attempts = ?",
+            (job_id, attempt)
+        ).fetchone()
+        if row is None:
+            raise LeaseLostError(f"Job {job_id} is no longer held by attempt {attempt}")
+
+    def renew(self, job_id, attempt):
+        with self._connect() as db:
+            self._holds(db, job_id, attempt)
+            db.execute(
+                'UPDATE jobs SET lease_expires = ? WHERE id = ?',
+                (time.time() + self.lease_seconds, job_id)
+            )
+
+    def add_event(self, job_id, attempt, event, data):
+        with self._connect() as db:
+            self._holds(db, job_id, attempt)
+            seq = db.execute('SELECT COUNT(*) FROM job_events WHERE job_id = ?', (job_id,)).fetchone()[0]
+            db.execute(
+                'INSERT INTO job_events (job_id, seq, event, data) VALUES (?, ?, ?, ?)',
+                (job_id, seq, event, json.dumps(data))
+            )
+
+    def _finish(self, job_id, attempt, status, result=None, error=None):
+        with self._connect() as db:
+            self._holds(db, job_id, attempt)
+            db.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?',
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def complete(self, job_id, attempt, result):
+        self._finish(job_id, attempt, 'done', result=result)
+
+    def fail(self, job_id, attempt, error):
+        self._finish(job_id, attempt, 'failed', error=str(error))
+
+    def get(self, job_id, since=0):
+        # A deferred read transaction: pollers must not take the write lock workers need
+        with self._connect(immediate=False) as db:
+            row = db.execute(
+                'SELECT status, payload, result, error, created_at, updated_at, attempts FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            events = db.execute(
+                'SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq >= ? ORDER BY seq',
+                (job_id, since)
+            ).fetchall()
+        return {
+            'job_id': job_id,
+            'status': row[0],
+            'payload': json.loads(row[1]),
+            'result': json.loads(row[2]) if row[2] else None,
+            'error': row[3],
+            'created_at': row[4],
+            'updated_at': row[5],
+            'attempt': row[6],
+            'events': [{'seq': seq, 'event': event, 'data': json.loads(data)} for seq, event, data in events]
+        }
+
+    def pending_count(self):
+        with self._connect(immediate=False) as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+
+class _Transaction:
+    """
+    Runs a block inside BEGIN IMMEDIATE so claims are atomic across processes, or
+    inside a deferred BEGIN for reads, which sees one snapshot without blocking writers.
+    """
+
+    def __init__(self, db, immediate=True):
+        self.db = db
+        self.immediate = immediate
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE' if self.immediate else 'BEGIN')
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+def run_analysis_job(controller, broker, job_id, attempt, payload):
+    """
+    Run one analysis job, recording each streamed stage as a job event and the
+    combined results as the job result.
+    """
+    result = {'articles': [], 'sentiment_results': []}
+    for event, data in controller.analyze_stream(payload['company_name']):
+        broker.add_event(job_id, attempt, event, data)
+        if event == 'article':
+            result['articles'].append(data['article'])
+            result['sentiment_results'].append(data['sentiment'])
+        elif event == 'error':
+            result['error'] = data['error']
+        else:
+            result.update(data)
+    broker.complete(job_id, attempt, result)
+
+
+def _keep_lease(broker, job_id, attempt, finished, interval):
+    while not finished.wait(interval):
+        try:
+            broker.renew(job_id, attempt)
+        except LeaseLostError:
+            return
+        except Exception as e:
+            print(f"Error renewing the lease on job {job_id}: {e}")
+
+
+def _worker_main(broker_factory, controller_factory, poll_interval):
+    # Each worker process builds its own broker connection and loads the models once
+    broker = broker_factory()
+    controller = controller_factory()
+    while True:
+        job = broker.claim()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        job_id, payload, attempt = job
+        # Renew the lease a few times per lease period while the job runs
+        finished = threading.Event()
+        threading.Thread(
+            target=_keep_lease,
+            args=(broker, job_id, attempt, finished, getattr(broker, 'lease_seconds', 120) / 3),
+            name='job-lease',
+            daemon=True
+        ).start()
+        try:
+            run_analysis_job(controller, broker, job_id, attempt, payload)
+        except LeaseLostError as e:
+            # Another worker is running the job again; leave it to that attempt
+            print(f"Abandoning job {job_id}: {e}")
+        except Exception as e:
+            print(f"Error running job {job_id}: {e}")
+            try:
+                broker.fail(job_id, attempt, e)
+            except LeaseLostError:
+                pass
+        finally:
+            finished.set()
+
+
+class WorkerPool:
+    """
+    Bounded pool of local worker processes that pull jobs from a broker.
+
+    `broker_factory` and `controller_factory` must be picklable (module-level
+    callables or functools.partial of them) because workers are started with
+    the 'spawn' method and build their own broker and controller.
+    """
+
+    def __init__(self, broker_factory, controller_factory, workers=2, poll_interval=0.5, start_method='spawn'):
+        self.broker_factory = broker_factory
+        self.controller_factory = controller_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.context = multiprocessing.get_context(start_method)
+        self.processes = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the workers, or replace the ones that have died since the last call.
+        """
+        with self._lock:
+            running = {process.name: process for process in self.processes if process.is_alive()}
+            for process in self.processes:
+                if process.name not in running:
+                    print(f"Worker {process.name} exited with code {process.exitcode}, restarting it")
+                    process.join(timeout=0)
+            self.processes = list(running.values())
+            for index in range(self.workers):
+                if f'analysis-worker-{index}' in running:
+                    continue
+                process = self.context.Process(
+                    target=_worker_main,
+                    args=(self.broker_factory, self.controller_factory, self.poll_interval),
+                    name=f'analysis-worker-{index}',
+                    daemon=True
+                )
+                process.start()
+                self.processes.append(process)
+
+    def alive(self):
+        return sum(1 for process in self.processes if process.is_alive())
+
+    def stop(self):
+        with self._lock:
+            for process in self.processes:
+                process.terminate()
+            for process in self.processes:
+                process.join(timeout=5)
+            self.processes = []
@@ -0,0 +1,194 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+class Histogram:
+    """
+    Cumulative bucket histogram (Prometheus style) that is cheap to update from many threads.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets + [float('inf')], counts):
+            running += bucket_count
+            cumulative.append(('+Inf' if bound == float('inf') else bound, running))
+        return {'buckets': cumulative, 'sum': total, 'count': count}
+
+
+class MetricsRegistry:
+    """
+    Process-wide histograms and counters, rendered in the Prometheus text format.
+    Metrics are declared once with their help text; label sets are created on first use.
+    """
+
+    def __init__(self):
+        self._definitions = {}  # name -> (type, help, buckets)
+        self._histograms = {}   # (name, labels) -> Histogram
+        self._counters = {}     # (name, labels) -> float
+        self._lock = threading.Lock()
+
+    def define_histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            self._definitions.setdefault(name, ('histogram', help_text, buckets))
+
+    def define_counter(self, name, help_text):
+        with self._lock:
+            self._definitions.setdefault(name, ('counter', help_text, None))
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self._definitions[name][2])
+        histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self, name, **labels):
+        histogram = self._histograms.get((name, tuple(sorted(labels.items()))))
+        return histogram.snapshot() if histogram is not None else None
+
+    def render(self):
+        # Copy the registry under the lock; other threads add label sets while we render
+        with self._lock:
+            definitions = sorted(self._definitions.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: str(item[0]))
+            counters = sorted(self._counters.items(), key=lambda item: str(item[0]))
+
+        lines = []
+        for name, (metric_type, help_text, _) in definitions:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            if metric_type == 'histogram':
+                for (metric_name, labels), histogram in histograms:
+                    if metric_name != name:
+                        continue
+                    snapshot = histogram.snapshot()
+                    for bound, count in snapshot['buckets']:
+                        lines.append(f'{name}_bucket{_labels(labels + (("le", bound),))} {count}')
+                    lines.append(f'{name}_sum{_labels(labels)} {snapshot["sum"]}')
+                    lines.append(f'{name}_count{_labels(labels)} {snapshot["count"]}')
+            else:
+                for (metric_name, labels), value in counters:
+                    if metric_name == name:
+                        lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' '))
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+METRICS = MetricsRegistry()
+METRICS.define_histogram('pipeline_stage_seconds', 'Time spent in each analysis pipeline stage.')
+METRICS.define_histogram('pipeline_stage_items', 'Items handled per pipeline stage call.', SIZE_BUCKETS)
+METRICS.define_histogram('model_batch_size', 'Items per model forward pass or pipeline call.', SIZE_BUCKETS)
+METRICS.define_histogram('news_fetch_seconds', 'Latency of fetching one news source.')
+METRICS.define_counter('news_fetch_errors_total', 'News source fetches that failed or timed out.')
+METRICS.define_counter('cache_lookups_total', 'Result cache lookups by model and outcome.')
+METRICS.define_histogram('inference_queue_wait_seconds', 'Time requests wait in the cross-request batcher.',
+                         [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0])
+
+
+class RequestTrace:
+    """
+    Per-request stage timing breakdown, collected by stage() in the request's context.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+
+    def record(self, name, seconds, items=None):
+        self.stages.append({'stage': name, 'ms': round(seconds * 1000, 2), 'items': items})
+
+    def breakdown(self):
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'stages': self.stages
+        }
+
+    def server_timing(self):
+        """
+        Stage durations as a Server-Timing header value (repeated stages are summed).
+        """
+        totals = {}
+        for stage in self.stages:
+            totals[stage['stage']] = totals.get(stage['stage'], 0) + stage['ms']
+        return ', '.join(f'{name};dur={duration:.1f}' for name, duration in totals.items())
+
+
+_current_trace = contextvars.ContextVar('request_trace', default=None)
+
+
+def start_trace():
+    trace = RequestTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+class _StageTimer:
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items
+
+
+@contextmanager
+def stage(name, items=None):
+    """
+    Time a pipeline stage into the stage histograms and the current request trace, if any.
+    The yielded timer's `items` can be set inside the block when the count is only known later.
+    """
+    timer = _StageTimer(items)
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        elapsed = time.perf_counter() - start
+        METRICS.observe('pipeline_stage_seconds', elapsed, stage=name)
+        if timer.items is not None:
+            METRICS.observe('pipeline_stage_items', timer.items, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.record(name, elapsed, timer.items)
@@ -0,0 +1,112 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Loads models on first use instead of at import time.
+
+    Services register a loader per model name and fetch the model with get();
+    the loader runs once, guarded by a per-model lock so concurrent requests
+    share a single load. warm() can preload models in a background thread.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._locks = {}
+        self._status = {}
+        self._load_times = {}
+        self._overridden = set()
+        # Set by warm(); until then models are only loaded on first use
+        self.warming = False
+        self._registry_lock = threading.Lock()
+
+    def register(self, name, loader, override=False):
+        """
+        Register the loader for a model name. Registering a name twice is an error,
+        except that an override (e.g. a stand-in model for benchmarks or tests)
+        replaces the existing loader and later registrations of that name are ignored.
+        """
+        with self._registry_lock:
+            if name in self._overridden:
+                return
+            if name in self._loaders and not override:
+                raise ValueError(f"A model is already registered under '{name}'")
+            if override:
+                self._overridden.add(name)
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+            self._status[name] = 'not_loaded'
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+
+            self._status[name] = 'loading'
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._status[name] = f'error: {e}'
+                raise
+            self._models[name] = model
+            self._load_times[name] = round(time.perf_counter() - start, 2)
+            self._status[name] = 'loaded'
+            return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def status(self):
+        """
+        Report the state of each registered model and how long loaded ones took.
+        """
+        return {
+            name: {'status': status, 'load_seconds': self._load_times.get(name)}
+            for name, status in self._status.items()
+        }
+
+    def ready(self, names=None):
+        """
+        Whether the given models (all registered ones by default) are loaded.
+        Without names and before warm() nothing is preloaded, so there is nothing to
+        wait for: models load on first use and this is True.
+        """
+        if names is None:
+            if not self.warming:
+                return True
+            names = self._loaders.keys()
+        return all(self.is_loaded(name) for name in names)
+
+    def warm(self, names=None, background=True):
+        """
+        Load the given models (all registered ones by default).
+        With background=True this returns the started thread immediately.
+        """
+        names = list(self._loaders) if names is None else list(names)
+        self.warming = True
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Error warming model {name}: {e}")
+
+        if not background:
+            load_all()
+            return None
+
+        thread = threading.Thread(target=load_all, name='model-warmup', daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+
+
+class ModelServerError(Exception):
+    pass
+
+
+class ModelServer:
+    """
+    Owns the models in a single process and serves inference to local clients
+    (app and job worker processes) over a Unix socket.
+
+    Requests are tuples: ('run', name, items), ('stats',) or ('status',), each
+    answered with ('ok', value) or ('error', message). 'run' goes through the
+    server's InferenceScheduler, so items from different client processes are
+    batched together. Each connection is served by its own thread.
+    `backends` maps each model to the inference backend it runs on here; 'status'
+    reports it so clients key their result caches by the backend that produced them.
+    """
+
+    def __init__(self, scheduler, models, socket_path, authkey=None, backends=None):
+        self.scheduler = scheduler
+        self.models = models
+        self.socket_path = socket_path
+        self.authkey = authkey
+        self.backends = dict(backends or {})
+        self.listener = None
+        self.stats = {'connections': 0, 'requests': 0, 'errors': 0}
+        self._lock = threading.Lock()
+
+    def serve_forever(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        # A socket file left behind by a previous server would make bind() fail
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        # Only the owning user may connect
+        old_umask = os.umask(0o177)
+        try:
+            self.listener = Listener(self.socket_path, family='AF_UNIX', authkey=self.authkey)
+        finally:
+            os.umask(old_umask)
+
+        while True:
+            listener = self.listener
+            if listener is None:
+                return  # close() was called
+            try:
+                connection = listener.accept()
+            except OSError:
+                if self.listener is None:
+                    return
+                raise
+            except Exception as e:
+                # e.g. a client with the wrong authkey
+                print(f"Rejected model server connection: {e}")
+                continue
+            with self._lock:
+                self.stats['connections'] += 1
+            threading.Thread(target=self._serve_connection, args=(connection,), name='model-server-conn', daemon=True).start()
+
+    def _serve_connection(self, connection):
+        with connection:
+            while True:
+                try:
+                    request = connection.recv()
+                    connection.send(self.handle(request))
+                except (EOFError, OSError):
+                    return  # Client went away
+
+    def handle(self, request):
+        with self._lock:
+            self.stats['requests'] += 1
+        try:
+            operation = request[0]
+            if operation == 'run':
+                return 'ok', self.scheduler.run(request[1], request[2])
+            if operation == 'stats':
+                return 'ok', {**self.scheduler.stats(), 'server': dict(self.stats)}
+            if operation == 'status':
+                return 'ok', {
+                    'ready': self.models.ready(),
+                    'lazy': not self.models.warming,
+                    'models': self.models.status(),
+                    'backends': self.backends
+                }
+            raise ValueError(f"Unknown model server request '{operation}'")
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            return 'error', f"{type(e).__name__}: {e}"
+
+    def close(self):
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.close()
+
+
+class ModelServerClient:
+    """
+    Stand-in for InferenceScheduler in processes that do not load any models:
+    run() forwards the items to a ModelServer and returns its results.
+    Each thread keeps its own connection; a dropped connection is reopened once.
+    """
+
+    def __init__(self, socket_path, authkey=None, connect_timeout=60):
+        self.socket_path = socket_path
+        self.authkey = authkey
+        # How long to wait for a server that is still starting
+        self.connect_timeout = connect_timeout
+        self._local = threading.local()
+        self._backends = None
+
+    def register(self, name, batch_fn, max_batch_size=None):
+        # The model server registers its own copy of every batch function
+        pass
+
+    def _connection(self, connect_timeout=None):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            return connection
+
+        deadline = time.monotonic() + (self.connect_timeout if connect_timeout is None else connect_timeout)
+        while True:
+            try:
+                connection = Client(self.socket_path, family='AF_UNIX', authkey=self.authkey)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise ModelServerError(f"No model server listening on {self.socket_path}")
+                time.sleep(0.5)
+        self._local.connection = connection
+        return connection
+
+    def _call(self, request, connect_timeout=None):
+        for attempt in range(2):
+            connection = self._connection(connect_timeout)
+            try:
+                connection.send(request)
+                status, value = connection.recv()
+                break
+            except (EOFError, OSError):
+                # The server restarted; inference is idempotent so the request can be resent
+                self._local.connection = None
+                connection.close()
+                if attempt:
+                    raise
+        if status == 'error':
+            raise ModelServerError(value)
+        return value
+
+    def run(self, name, items):
+        items = list(items)
+        if not items:
+            return []
+        return self._call(('run', name, items))
+
+    def stats(self):
+        return self._call(('stats',))
+
+    def status(self):
+        """
+        Model load status as reported by the server: {'ready', 'models', 'backends'}.
+        Fails fast instead of waiting for a server that is not up, for readiness probes.
+        """
+        return self._call(('status',), connect_timeout=0)
+
+    def backend_name(self, model):
+        """
+        Name of the inference backend the server runs `model` on, asked once per client.
+        """
+        if self._backends is None:
+            self._backends = self._call(('status',)).get('backends', {})
+        return self._backends.get(model, 'pytorch')
@@ -1,151 +1,169 @@
-import requests
-from bs4 import BeautifulSoup
-from transformers import pipeline
 from collections import Counter
 import spacy
+import torch
 import re
-from urllib.parse import urljoin, quote_plus
+from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor, wait
 import time
+from services.http_client import HttpClient
+from services.model_registry import ModelRegistry
+from services.inference_backends import PyTorchBackend
+from services.token_packing import TokenPacker
+from services.dedup import ArticleDeduplicator
+from services.parsers import parse_rss_items, get_extractor
+from services.sources import NEWS_SOURCES
+from services.metrics import METRICS, stage
+
 
 class NewsService:
-    def __init__(self):
-        self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-        self.nlp = spacy.load("en_core_web_sm")
+    def __init__(self, fetch_timeout=10, fetch_deadline=15, max_fetch_workers=None,
+                 summary_batch_size=8, summary_bucket_tokens=16, cache=None, models=None,
+                 dedup_max_distance=3, spacy_batch_size=32, spacy_n_process=1,
+                 spacy_disable=('lemmatizer',), scheduler=None, max_items_per_source=5,
+                 backend=None, summary_max_tokens=None):
+        self.summary_model_name = "facebook/bart-large-cnn"
+        self.spacy_model_name = "en_core_web_sm"
+        # Models are loaded on first use through the (optionally shared) registry
+        self.models = models or ModelRegistry()
+        # Runtime for the summarizer: fp32 PyTorch by default, or int8/ONNX (see inference_backends.py)
+        self.backend = backend or PyTorchBackend()
+        self.models.register('summarizer', lambda: self.backend.load_summarizer(self.summary_model_name))
+        # Components we never read from (lemmas) are disabled; NER and the parser
+        # (for noun_chunks) stay enabled
+        self.models.register('spacy', lambda: spacy.load(self.spacy_model_name, disable=list(spacy_disable)))
+        self.spacy_batch_size = spacy_batch_size
+        self.spacy_n_process = spacy_n_process
+        # Optional ResultCache shared with the other services
+        self.cache = cache
+        # Optional InferenceScheduler (or ModelServerClient) that merges summarization and
+        # spaCy work across concurrent requests
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.register('summarizer', self.summarize_batch)
+            scheduler.register('spacy', self.analyze_texts)
+        # Articles are summarized in batches of similar token length (see summarize_chunks)
+        self.summary_batch_size = summary_batch_size
+        self.summary_bucket_tokens = summary_bucket_tokens
+        # Input chunk size in tokens; defaults to the summarizer's own limit (1024 for BART)
+        self.summary_max_tokens = summary_max_tokens
+        self._summary_packer = None
         # Using more accessible news sources
-        self.news_sources = [
-            {
-                'url': 'https://news.google.com/rss/search?q=',
-                'type': 'rss'
-            },
-            {
-                'url': 'https://www.marketwatch.com/search?q=',
-                'type': 'html'
-            },
-            {
-                'url': 'https://www.techradar.com/search?searchTerm=',
-                'type': 'html'
-            }
-        ]
+        self.news_sources = [dict(source) for source in NEWS_SOURCES]
+        self.max_items_per_source = max_items_per_source
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
         }
+        # Pooled keep-alive session shared by all sources, with conditional GET per feed URL
+        self.http = HttpClient(headers=self.headers, timeout=fetch_timeout)
+        # Per-request socket timeout and overall deadline for one fetch_news call (seconds)
+        self.fetch_timeout = fetch_timeout
+        self.fetch_deadline = fetch_deadline
+        # Syndicated copies of the same story are collapsed before summarization (None disables)
+        self.deduplicator = ArticleDeduplicator(max_distance=dedup_max_distance) if dedup_max_distance is not None else None
+        # Sources are fetched in parallel so the slowest one bounds the wait, not the sum of all.
+        # Each fetch_all_sources call gets its own threads, so concurrent requests never queue
+        # behind each other or behind a hung source
+        self.max_fetch_workers = max_fetch_workers
     
-    def extract_keywords(self, text):
-        """
-        Extract meaningful keywords using spaCy.
-        """
-        doc = self.nlp(text)
-        keywords = []
-
-        # Extract named entities (e.g., ORG, PERSON, GPE)
-        for ent in doc.ents:
-            if ent.label_ in ["ORG", "PERSON", "GPE", "PRODUCT", "EVENT"]:
-                keywords.append(ent.text)
+    @property
+    def summarizer(self):
+        return self.models.get('summarizer')
 
-        # Extract noun phrases
-        for chunk in doc.noun_chunks:
-            keywords.append(chunk.text)
+    @property
+    def nlp(self):
+        return self.models.get('spacy')
 
-        # Return the most common keywords
-        return [keyword for keyword, _ in Counter(keywords).most_common(10)]
+    def parse_texts(self, texts):
+        """
+        Parse all texts in one spaCy pass with nlp.pipe.
+        """
+        return list(self.nlp.pipe(texts, batch_size=self.spacy_batch_size, n_process=self.spacy_n_process))
 
-    def extract_topics(self, text):
-        doc = self.nlp(text)
+    def _topic_terms_from_doc(self, doc):
         # Extract named entities and noun phrases
         entities = [ent.text for ent in doc.ents if ent.label_ in ['ORG', 'PRODUCT', 'EVENT', 'TECH']]
         noun_phrases = [chunk.text for chunk in doc.noun_chunks]
-        
+        return entities + noun_phrases
+
+    def top_topics(self, topic_terms, n=5):
         # Combine and get most common topics
-        all_topics = entities + noun_phrases
-        return [topic for topic, _ in Counter(all_topics).most_common(5)]
-
-    def process_article(self, title, full_text):
-        # Clean and prepare text
-        cleaned_text = self.clean_text(f"{title}. {full_text}")
-        
-        # Generate summary
-        summary = self.summarize_text(cleaned_text)
-        
-        # Extract topics
-        topics = self.extract_topics(cleaned_text)
-        
-        return {
-            'summary': summary,
-            'topics': topics
-        }
+        return [topic for topic, _ in Counter(topic_terms).most_common(n)]
+
+    def analyze_texts(self, texts):
+        """
+        Parse every text once and derive its topic candidates from the Doc.
+        Returns one {'topic_terms'} dict per text.
+        """
+        return [{'topic_terms': self._topic_terms_from_doc(doc)} for doc in self.parse_texts(texts)]
+
+    def analyze_shared(self, texts):
+        """
+        analyze_texts, routed through the shared scheduler when one is configured.
+        """
+        if self.scheduler is not None:
+            return self.scheduler.run('spacy', texts)
+        return self.analyze_texts(texts)
 
-    def fetch_rss_feed(self, url, company_name):
+    def fetch_rss_feed(self, url, company_name, raise_errors=False):
         try:
             full_url = f"{url}{quote_plus(company_name)}"
-            response = requests.get(full_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'xml')
-            items = soup.find_all('item')
-            
-            articles = []
-            for item in items[:5]:
-                title = item.title.text if item.title else ''
-                description = item.description.text if item.description else ''
-                link = item.link.text if item.link else ''
-                
-                if title and description:
-                    articles.append({
-                        'title': self.clean_text(title),
-                        'full_summary': self.clean_text(description),
-                        'link': link,
-                        'source': 'Google News'
-                    })
-            return articles
+            return self.http.fetch(full_url, self.parse_rss_feed, timeout=self.fetch_timeout, stream=True)
         except Exception as e:
+            if raise_errors:
+                raise
+            METRICS.inc('news_fetch_errors_total', source=url.split('/')[2], status='error')
             print(f"Error fetching RSS feed: {e}")
             return []
 
-    def fetch_html_page(self, source, company_name):
+    def parse_rss_feed(self, response):
+        # Stream the body through an incremental XML parser and stop after enough items
+        items = parse_rss_items(response.iter_content(chunk_size=16384), limit=self.max_items_per_source)
+
+        articles = []
+        for item in items:
+            if item['title'] and item['description']:
+                articles.append({
+                    'title': self.clean_text(item['title']),
+                    'full_summary': self.clean_text(item['description']),
+                    'link': item['link'],
+                    'source': 'Google News'
+                })
+        return articles
+
+    def fetch_html_page(self, source, company_name, raise_errors=False):
         try:
             full_url = f"{source['url']}{quote_plus(company_name)}"
-            response = requests.get(full_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            articles = []
-            
-            if 'marketwatch.com' in source['url']:
-                items = soup.find_all('div', class_='article__content')
-                base_url = 'https://www.marketwatch.com'
-            elif 'techradar.com' in source['url']:
-                items = soup.find_all('div', class_='article-card')
-                base_url = 'https://www.techradar.com'
-            else:
-                items = []
-                base_url = ''
-
-            for item in items[:5]:
-                try:
-                    title = item.find('h3').get_text(strip=True) if item.find('h3') else ''
-                    summary = item.find('p').get_text(strip=True) if item.find('p') else ''
-                    link_elem = item.find('a')
-                    link = urljoin(base_url, link_elem['href']) if link_elem and 'href' in link_elem.attrs else ''
-                    
-                    if title and (summary or link):
-                        articles.append({
-                            'title': self.clean_text(title),
-                            'full_summary': self.clean_text(summary),
-                            'link': link,
-                            'source': base_url
-                        })
-                except Exception as e:
-                    print(f"Error processing article: {e}")
-                    continue
-                    
-            return articles
+            return self.http.fetch(
+                full_url,
+                lambda response: self.parse_html_page(source, response),
+                timeout=self.fetch_timeout
+            )
         except Exception as e:
+            if raise_errors:
+                raise
+            METRICS.inc('news_fetch_errors_total', source=source['url'].split('/')[2], status='error')
             print(f"Error fetching HTML page: {e}")
             return []
 
+    def parse_html_page(self, source, response):
+        rules = source.get('rules')
+        if not rules:
+            return []
+
+        articles = []
+        for item in get_extractor(rules).extract(response.content, limit=self.max_items_per_source):
+            if item['title'] and (item['summary'] or item['link']):
+                articles.append({
+                    'title': self.clean_text(item['title']),
+                    'full_summary': self.clean_text(item['summary']),
+                    'link': item['link'],
+                    'source': rules.get('base_url', '')
+                })
+        return articles
+
     def clean_text(self, text):
         # Remove HTML tags
         text = re.sub(r'<[^>]+>', '', text)
@@ -155,66 +173,322 @@ class NewsService:
         text = re.sub(r'[^\w\s.,!?-]', '', text)
         return text
 
-    def summarize_text(self, text):
-        try:
-            if not text or len(text.strip()) < 50:
-                return text
-            
-            # Calculate appropriate max_length based on input length
-            input_length = len(text.split())
-            max_length = min(int(input_length * 0.4), 130)  # 40% of input length, max 130 tokens
-            min_length = min(int(max_length * 0.6), 30)     # 60% of max_length, max 30 tokens
-            
-            # Ensure text isn't too long for the model
-            max_chars = 1024
-            if len(text) > max_chars:
-                text = text[:max_chars]
-            
-            summary = self.summarizer(
-                text,
+    def _summary_budget(self, token_count, bucket_tokens=1):
+        """
+        Compute (max_length, min_length) in tokens for a summary of `token_count` input tokens.
+        The count is rounded down to a multiple of `bucket_tokens` so that inputs
+        of similar length share a budget and can be batched together.
+        """
+        token_count -= token_count % bucket_tokens
+        # Short inputs share the first bucket instead of getting a zero-length budget
+        token_count = max(token_count, bucket_tokens, 10)
+        max_length = min(int(token_count * 0.4), 130)  # 40% of input length, max 130 tokens
+        min_length = min(int(max_length * 0.6), 30)    # 60% of max_length, max 30 tokens
+        return max_length, min_length
+
+    @property
+    def summary_packer(self):
+        # Built from the summarizer's own tokenizer, so chunks match its real token limit
+        if self._summary_packer is None:
+            self._summary_packer = TokenPacker(self.summarizer.tokenizer, max_tokens=self.summary_max_tokens)
+        return self._summary_packer
+
+    def _generate_summaries(self, chunks, max_length, min_length):
+        """
+        Run the summarization model on already tokenized chunks (no second tokenization).
+        """
+        tokenizer = self.summarizer.tokenizer
+        encoded = tokenizer.pad(
+            {'input_ids': [self.summary_packer.with_special_tokens(chunk) for chunk in chunks]},
+            return_tensors='pt'
+        )
+        with torch.no_grad():
+            output_ids = self.summarizer.model.generate(
+                **encoded,
                 max_length=max_length,
                 min_length=min_length,
-                do_sample=False,
-                truncation=True
+                do_sample=False
             )
-            return summary[0]['summary_text']
+        return [summary.strip() for summary in tokenizer.batch_decode(output_ids, skip_special_tokens=True)]
+
+    def _fallback_summary(self, text):
+        return text[:100] + "..."
+
+    def summarize_chunks(self, chunks, batch_size=None, bucket_tokens=None):
+        """
+        Summarize token-id chunks, batching chunks of similar length together so
+        little compute goes to padding. Returns one summary per chunk.
+        A failing batch is retried chunk by chunk; chunks that still fail get None.
+        """
+        batch_size = batch_size or self.summary_batch_size
+        bucket_tokens = bucket_tokens or self.summary_bucket_tokens
+        summaries = [None] * len(chunks)
+
+        buckets = {}
+        for index in sorted(range(len(chunks)), key=lambda i: len(chunks[i])):
+            buckets.setdefault(self._summary_budget(len(chunks[index]), bucket_tokens), []).append(index)
+
+        for (max_length, min_length), indices in buckets.items():
+            for start in range(0, len(indices), batch_size):
+                batch = indices[start:start + batch_size]
+                METRICS.observe('model_batch_size', len(batch), model='summarizer')
+                try:
+                    outputs = self._generate_summaries([chunks[i] for i in batch], max_length, min_length)
+                    for i, summary in zip(batch, outputs):
+                        summaries[i] = summary
+                except Exception as e:
+                    print(f"Error in batch summarization, falling back to single chunks: {e}")
+                    for i in batch:
+                        try:
+                            summaries[i] = self._generate_summaries([chunks[i]], max_length, min_length)[0]
+                        except Exception as e:
+                            print(f"Error in summarization: {e}")
+        return summaries
+
+    def summarize_batch(self, texts, batch_size=None, bucket_tokens=None):
+        """
+        Summarize many texts with batched model calls.
+        Each text is tokenized once and packed into whole-sentence chunks that fit
+        the model's token limit. All chunks of all texts are summarized together
+        (map); texts that needed several chunks then have their joined chunk
+        summaries summarized again (reduce). Short texts are returned unchanged.
+        Texts with a chunk the model failed on get None rather than a partial
+        summary, so the caller can fall back without caching the result.
+        """
+        summaries = list(texts)
+        indices = [i for i, text in enumerate(texts) if text and len(text.strip()) >= 50]
+        if not indices:
+            return summaries
+
+        # Map: every chunk of every text is one work item
+        chunked = self.summary_packer.pack_texts([texts[i] for i in indices])
+        owners = [i for i, chunks in zip(indices, chunked) for _ in chunks]
+        outputs = self.summarize_chunks([chunk for chunks in chunked for chunk in chunks], batch_size, bucket_tokens)
+
+        partials = {}
+        for i, summary in zip(owners, outputs):
+            partials.setdefault(i, []).append(summary)
+
+        # Failed chunks stay out of the reduce step; their whole text is a failure
+        failed = {i for i, parts in partials.items() if None in parts}
+        for i in failed:
+            summaries[i] = None
+
+        # Reduce: chunk summaries are at most 130 tokens, so each round shrinks the text
+        long_texts = [i for i in indices if i not in failed and len(partials.get(i, [])) > 1]
+        for i in indices:
+            if i not in failed and len(partials.get(i, [])) == 1:
+                summaries[i] = partials[i][0]
+        if long_texts:
+            reduced = self.summarize_batch([" ".join(partials[i]) for i in long_texts], batch_size, bucket_tokens)
+            for i, summary in zip(long_texts, reduced):
+                summaries[i] = summary
+        return summaries
+
+    # Bump when the packing or length budgeting changes, so cached summaries are not reused
+    SUMMARY_CACHE_VERSION = 2
+
+    @property
+    def summary_cache_id(self):
+        """
+        Result cache id for summaries: model and backend plus every packing parameter.
+        """
+        return (
+            f"{self.backend.cache_id(self.summary_model_name)}:packed-v{self.SUMMARY_CACHE_VERSION}"
+            f":max_tokens={self.summary_max_tokens or 'model'}:bucket={self.summary_bucket_tokens}"
+        )
+
+    def summarize_shared(self, texts):
+        """
+        summarize_batch, routed through the shared scheduler when one is configured.
+        """
+        if self.scheduler is not None:
+            return self.scheduler.run('summarizer', texts)
+        return self.summarize_batch(texts)
+
+    def process_articles(self, articles):
+        """
+        Adds 'summary' and 'topics' to every article in place, summarizing all
+        of them together and parsing them with spaCy in a single nlp.pipe pass.
+        Returns the per-article spaCy analyses (see analyze_texts).
+        """
+        cleaned_texts = [self.clean_text(f"{a['title']}. {a['full_summary']}") for a in articles]
+
+        with stage('summarize', items=len(cleaned_texts)):
+            if self.cache is not None:
+                summaries = self.cache.map(self.summary_cache_id, cleaned_texts, self.summarize_shared)
+            else:
+                summaries = self.summarize_shared(cleaned_texts)
+            # Failed summaries are not cached; the article shows the truncated text instead
+            summaries = [
+                summary if summary is not None else self._fallback_summary(text)
+                for text, summary in zip(cleaned_texts, summaries)
+            ]
+
+        with stage('spacy', items=len(cleaned_texts)):
+            if self.cache is not None:
+                analyses = self.cache.map(f"{self.spacy_model_name}:analysis", cleaned_texts, self.analyze_shared)
+            else:
+                analyses = self.analyze_shared(cleaned_texts)
+
+        for article, summary, analysis in zip(articles, summaries, analyses):
+            article.update({
+                'summary': summary,
+                'topics': self.top_topics(analysis['topic_terms'])
+            })
+        return analyses
+
+    def fetch_source(self, source, company_name, raise_errors=False):
+        """
+        Fetch raw articles from a single news source.
+        With raise_errors=True network/HTTP errors propagate instead of yielding [].
+        """
+        if source['type'] == 'rss':
+            return self.fetch_rss_feed(source['url'], company_name, raise_errors=raise_errors)
+        return self.fetch_html_page(source, company_name, raise_errors=raise_errors)
+
+    def _timed_fetch(self, source, company_name):
+        """
+        Returns (articles, seconds, error); a failing source still reports how long it took.
+        """
+        start = time.perf_counter()
+        try:
+            articles = self.fetch_source(source, company_name, raise_errors=True)
         except Exception as e:
-            print(f"Error in summarization: {e}")
-            return text[:100] + "..."
+            return [], time.perf_counter() - start, e
+        return articles, time.perf_counter() - start, None
 
-    def fetch_news(self, company_name):
+    def fetch_all_sources(self, company_name, deadline=None):
+        """
+        Fetch every news source concurrently, waiting at most `deadline` seconds overall.
+        Returns one entry per source (in source order) with its articles, latency and status.
+        Sources that miss the deadline are reported as 'timeout' with no articles.
+        """
+        if deadline is None:
+            deadline = self.fetch_deadline
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_fetch_workers or len(self.news_sources),
+            thread_name_prefix='news-fetch'
+        )
+        futures = {
+            executor.submit(self._timed_fetch, source, company_name): source
+            for source in self.news_sources
+        }
+        done, _ = wait(futures, timeout=deadline)
+        # Sources still running finish in the background (bounded by fetch_timeout); nobody waits for them
+        executor.shutdown(wait=False)
+
+        results = []
+        for future, source in futures.items():
+            articles = []
+            if future in done:
+                articles, latency, error = future.result()
+                status = 'ok'
+                if error is not None:
+                    print(f"Error fetching source {source['url']}: {error}")
+                    status = 'error'
+            else:
+                # The request keeps running on its own thread; its result is discarded
+                print(f"Timed out fetching source {source['url']} after {deadline}s")
+                latency = deadline
+                status = 'timeout'
+
+            source_name = source['url'].split('/')[2]
+            METRICS.observe('news_fetch_seconds', latency, source=source_name)
+            if status != 'ok':
+                METRICS.inc('news_fetch_errors_total', source=source_name, status=status)
+
+            results.append({
+                'source': source,
+                'articles': articles,
+                'latency': latency,
+                'status': status
+            })
+        return results
+
+    def collect_articles(self, company_name):
+        """
+        Fetch every source and collapse near-duplicates, without running any model.
+        The returned dict is completed by process_articles/finalize_source_topics.
+        """
         all_articles = []
         source_summaries = {}
 
-        for source in self.news_sources:
-            articles = []
+        fetch_start = time.perf_counter()
+        with stage('fetch') as timer:
+            fetch_results = self.fetch_all_sources(company_name)
+            timer.items = sum(len(result['articles']) for result in fetch_results)
+        fetch_latency = time.perf_counter() - fetch_start
+
+        article_sources = []
+        for result in fetch_results:
+            source = result['source']
+            articles = result['articles']
             try:
-                if source['type'] == 'rss':
-                    articles = self.fetch_rss_feed(source['url'], company_name)
-                else:
-                    articles = self.fetch_html_page(source, company_name)
-                
-                for article in articles:
-                    processed = self.process_article(article['title'], article['full_summary'])
-                    article.update({
-                        'summary': processed['summary'],
-                        'topics': processed['topics'],
-                        'source_type': source['type']
-                    })
-                    all_articles.append(article)
-                
-                # Store summaries by source for comparison
+                # Store summaries by source for comparison; topics are filled in after parsing
                 source_name = source['url'].split('/')[2]
                 source_summaries[source_name] = {
                     'article_count': len(articles),
-                    'topics': self.extract_topics(' '.join([a['full_summary'] for a in articles]))
+                    'topics': [],
+                    'latency_ms': round(result['latency'] * 1000, 1),
+                    'status': result['status']
                 }
 
+                for article in articles:
+                    article['source_type'] = source['type']
+                    all_articles.append(article)
+                    article_sources.append(source_name)
+
             except Exception as e:
                 print(f"Error processing source {source['url']}: {e}")
                 continue
 
+        # Keep one representative per near-duplicate cluster so each story is only modeled once
+        fetched_count = len(all_articles)
+        if self.deduplicator is not None:
+            with stage('dedup', items=fetched_count):
+                clusters = self.deduplicator.cluster(all_articles)
+                all_articles = self.deduplicator.collapse(all_articles, clusters)
+        else:
+            clusters = [[i] for i in range(fetched_count)]
+
+        return {
+            'articles': all_articles,
+            'clusters': clusters,
+            'article_sources': article_sources,
+            'comparative_analysis': source_summaries,
+            'fetch_latency_ms': round(fetch_latency * 1000, 1),
+            'duplicates_collapsed': fetched_count - len(all_articles)
+        }
+
+    def finalize_source_topics(self, collected, analyses):
+        """
+        Fill in per-source topics from the article analyses returned by process_articles.
+        A collapsed story counts for every source that carried it.
+        """
+        source_summaries = collected['comparative_analysis']
+        source_terms = {name: [] for name in source_summaries}
+        for members, analysis in zip(collected['clusters'], analyses):
+            for source_name in {collected['article_sources'][i] for i in members}:
+                source_terms[source_name].extend(analysis['topic_terms'])
+        for source_name, terms in source_terms.items():
+            source_summaries[source_name]['topics'] = self.top_topics(terms)
+        return source_summaries
+
+    def select_top_articles(self, articles, limit=10):
+        return sorted(articles, key=lambda x: len(x['topics']), reverse=True)[:limit]
+
+    def fetch_news(self, company_name):
+        collected = self.collect_articles(company_name)
+
+        # Summarize every collected article in a few batched model calls and parse them once
+        analyses = self.process_articles(collected['articles'])
+        self.finalize_source_topics(collected, analyses)
+
         return {
-            'articles': sorted(all_articles, key=lambda x: len(x['topics']), reverse=True)[:10],
-            'comparative_analysis': source_summaries
-        }
\ No newline at end of file
+            'articles': self.select_top_articles(collected['articles']),
+            'comparative_analysis': collected['comparative_analysis'],
+            'fetch_latency_ms': collected['fetch_latency_ms'],
+            'duplicates_collapsed': collected['duplicates_collapsed']
+        }
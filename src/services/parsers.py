@@ -0,0 +1,94 @@
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+# lxml is much faster than the pure-Python html.parser; fall back when it is not installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+def parse_rss_items(chunks, limit=5):
+    """
+    Stream-parse RSS from an iterable of byte chunks and stop after `limit` items.
+    Returns a list of {'title', 'description', 'link'} dicts with raw text values.
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    items = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            if _local_name(element.tag) != 'item':
+                continue
+            items.append({
+                'title': _child_text(element, 'title'),
+                'description': _child_text(element, 'description'),
+                'link': _child_text(element, 'link')
+            })
+            # Free the finished item; the channel keeps growing otherwise
+            element.clear()
+            if len(items) >= limit:
+                return items
+    return items
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element, name):
+    for child in element:
+        if _local_name(child.tag) == name:
+            return child.text or ''
+    return ''
+
+
+class HtmlExtractor:
+    """
+    Extracts article teasers from an HTML search page using declarative CSS rules.
+
+    `rules` is a dict with 'item', 'title', 'summary' and 'link' selectors plus
+    'base_url' for relative links; selectors are compiled once per extractor.
+    """
+
+    def __init__(self, rules):
+        self.base_url = rules.get('base_url', '')
+        self.item = soupsieve.compile(rules['item'])
+        self.title = soupsieve.compile(rules['title'])
+        self.summary = soupsieve.compile(rules['summary'])
+        self.link = soupsieve.compile(rules['link'])
+
+    def extract(self, content, limit=5):
+        """
+        Return up to `limit` {'title', 'summary', 'link'} dicts from the page.
+        """
+        soup = BeautifulSoup(content, HTML_PARSER)
+        items = []
+        for item in self.item.select(soup, limit=limit):
+            title_elem = self.title.select_one(item)
+            summary_elem = self.summary.select_one(item)
+            link_elem = self.link.select_one(item)
+            items.append({
+                'title': title_elem.get_text(strip=True) if title_elem else '',
+                'summary': summary_elem.get_text(strip=True) if summary_elem else '',
+                'link': urljoin(self.base_url, link_elem['href']) if link_elem and link_elem.has_attr('href') else ''
+            })
+        return items
+
+
+_extractors = {}
+
+
+def get_extractor(rules):
+    """
+    Return the compiled HtmlExtractor for a rules dict, compiling it on first use.
+    """
+    key = tuple(sorted(rules.items()))
+    extractor = _extractors.get(key)
+    if extractor is None:
+        extractor = _extractors[key] = HtmlExtractor(rules)
+    return extractor
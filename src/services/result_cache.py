@@ -0,0 +1,180 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from services.metrics import METRICS
+
+
+class ResultCache:
+    """
+    Content-addressed cache for model outputs (summaries, topics, sentiment, embeddings).
+
+    Entries are keyed by a hash of the input text plus a model identifier, so the
+    same article seen again skips inference. There is an in-process LRU tier
+    bounded by total pickled size and an optional SQLite tier that survives restarts,
+    bounded by total size (oldest entries go first) and by entry age.
+    None is never stored: compute functions return it for inputs they failed on.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, db_path=None, max_disk_bytes=512 * 1024 * 1024,
+                 max_age_seconds=30 * 24 * 3600, prune_every=256):
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_seconds = max_age_seconds
+        # The disk tier is pruned after this many writes rather than on every write
+        self.prune_every = prune_every
+        self._writes_since_prune = 0
+        self._memory = OrderedDict()  # key -> (value, size), least recently used first
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)')
+            self._db.commit()
+            with self._lock:
+                self._prune_disk()
+
+    @staticmethod
+    def make_key(model_id, text):
+        digest = hashlib.sha256()
+        digest.update(model_id.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _remember(self, key, value, blob):
+        size = len(blob)
+        if size > self.max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.stats['evictions'] += 1
+
+    def get(self, model_id, text, default=None):
+        key = self.make_key(model_id, text)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                METRICS.inc('cache_lookups_total', model=model_id.split(':')[0], result='hit')
+                return entry[0]
+
+            if self._db is not None:
+                row = self._db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    value = pickle.loads(row[0])
+                    self._remember(key, value, row[0])
+                    self.stats['hits'] += 1
+                    self.stats['disk_hits'] += 1
+                    METRICS.inc('cache_lookups_total', model=model_id.split(':')[0], result='disk_hit')
+                    return value
+
+            self.stats['misses'] += 1
+            METRICS.inc('cache_lookups_total', model=model_id.split(':')[0], result='miss')
+            return default
+
+    def set(self, model_id, text, value):
+        self.set_many(model_id, [(text, value)])
+
+    def set_many(self, model_id, items):
+        """
+        Store several (text, value) pairs with a single disk commit; None values are skipped.
+        """
+        rows = []
+        with self._lock:
+            for text, value in items:
+                if value is None:
+                    continue
+                key = self.make_key(model_id, text)
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                self._remember(key, value, blob)
+                rows.append((key, blob, time.time()))
+
+            if self._db is not None and rows:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)',
+                    rows
+                )
+                self._db.commit()
+                self._writes_since_prune += len(rows)
+                if self._writes_since_prune >= self.prune_every:
+                    self._prune_disk()
+
+    def _prune_disk(self):
+        """
+        Drop disk entries older than max_age_seconds, then the oldest ones beyond max_disk_bytes.
+        """
+        self._writes_since_prune = 0
+        deleted = 0
+        if self.max_age_seconds is not None:
+            deleted += self._db.execute(
+                'DELETE FROM results WHERE created_at < ?', (time.time() - self.max_age_seconds,)
+            ).rowcount
+        if self.max_disk_bytes is not None:
+            # Keep the newest entries whose running total fits the budget
+            deleted += self._db.execute(
+                'DELETE FROM results WHERE key IN ('
+                ' SELECT key FROM ('
+                '  SELECT key, SUM(LENGTH(value)) OVER (ORDER BY created_at DESC, key) AS running_total'
+                '  FROM results'
+                ' ) WHERE running_total > ?'
+                ')',
+                (self.max_disk_bytes,)
+            ).rowcount
+        self._db.commit()
+        self.stats['disk_evictions'] += deleted
+
+    def get_many(self, model_id, texts):
+        """
+        Look up several texts at once.
+        Returns (values, missing) where values has None for misses and
+        missing lists the indices that still need to be computed.
+        """
+        values = [self.get(model_id, text) for text in texts]
+        missing = [i for i, value in enumerate(values) if value is None]
+        return values, missing
+
+    def map(self, model_id, texts, compute_batch):
+        """
+        Return one result per text, calling `compute_batch` only on the cache
+        misses (as a single list) and storing what it returns. Results that are
+        None (failures) are returned as None and not stored, so they are retried.
+        """
+        values, missing = self.get_many(model_id, texts)
+        if missing:
+            computed = list(compute_batch([texts[i] for i in missing]))
+            for i, value in zip(missing, computed):
+                values[i] = value
+            self.set_many(model_id, [(texts[i], value) for i, value in zip(missing, computed)])
+        return values
+
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM results')
+                self._db.commit()
@@ -1,16 +1,44 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import numpy as np
+from services.model_registry import ModelRegistry
+from services.inference_backends import PyTorchBackend
+from services.metrics import METRICS, stage
 
 class SentimentAnalysisService:
-    def __init__(self):
-        model_name = "cardiffnlp/twitter-roberta-base-sentiment-latest"
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        self.model.eval()
+    def __init__(self, max_batch_size=32, cache=None, models=None, scheduler=None, backend=None):
+        self.model_name = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+        # Tokenizer and model are loaded together on first use
+        self.models = models or ModelRegistry()
+        # Runtime for the classifier: fp32 PyTorch by default, or int8/ONNX (see inference_backends.py)
+        self.backend = backend or PyTorchBackend()
+        self.models.register('sentiment', self._load_model)
         self.labels = ['negative', 'neutral', 'positive']
+        # Upper bound on texts per forward pass, keeps padded batches within memory
+        self.max_batch_size = max_batch_size
+        self.default_result = ('neutral', {'positive': 0.33, 'neutral': 0.34, 'negative': 0.33})
+        # Optional ResultCache shared with the other services
+        self.cache = cache
+        # Optional InferenceScheduler that merges scoring work across concurrent requests
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.register('sentiment', self.get_sentiment_scores_batch, max_batch_size=max_batch_size)
 
-    def get_sentiment_scores(self, text):
+    def _load_model(self):
+        return self.backend.load_classifier(self.model_name)
+
+    @property
+    def tokenizer(self):
+        return self.models.get('sentiment')[0]
+
+    @property
+    def model(self):
+        return self.models.get('sentiment')[1]
+
+    def get_sentiment_scores(self, text, raise_errors=False):
+        """
+        Score one text. With raise_errors=True model errors propagate instead of
+        yielding the neutral default.
+        """
         try:
             # Tokenize and encode text
             encoded_input = self.tokenizer(text, return_tensors='pt', truncation=True, max_length=512)
@@ -36,34 +64,85 @@ class SentimentAnalysisService:
             return sentiment, sentiment_scores
             
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error in sentiment analysis: {e}")
-            return 'neutral', {'positive': 0.33, 'neutral': 0.34, 'negative': 0.33}
+            return self.default_result[0], dict(self.default_result[1])
 
-    def analyze_sentiment(self, articles):
-        sentiment_results = []
-        
-        for article in articles:
+    def get_sentiment_scores_batch(self, texts):
+        """
+        Batched counterpart of get_sentiment_scores.
+        Texts are tokenized together, run through the model in forward passes of
+        at most max_batch_size items, and scored with one softmax/argmax per batch.
+        A failing batch is retried item by item so an error only affects that text.
+        Texts that could not be scored get None, so the result cache does not keep
+        a fallback; analyze_sentiment substitutes the neutral default for them.
+        """
+        results = [None] * len(texts)
+        valid = []
+        for i, text in enumerate(texts):
+            if isinstance(text, str):
+                valid.append(i)
+            else:
+                print(f"Error in sentiment analysis: invalid text at position {i}")
+
+        for start in range(0, len(valid), self.max_batch_size):
+            batch = valid[start:start + self.max_batch_size]
+            METRICS.observe('model_batch_size', len(batch), model='sentiment')
             try:
-                # Use summarized text for sentiment analysis
-                text = article['summary']
-                
-                # Get sentiment scores
-                sentiment, sentiment_scores = self.get_sentiment_scores(text)
-                
-                sentiment_results.append({
-                    'title': article['title'],
-                    'summary': article['summary'],
-                    'sentiment': sentiment.capitalize(),
-                    'scores': sentiment_scores
-                })
-                
+                encoded_input = self.tokenizer(
+                    [texts[i] for i in batch],
+                    return_tensors='pt',
+                    padding=True,
+                    truncation=True,
+                    max_length=512
+                )
+                with torch.no_grad():
+                    output = self.model(**encoded_input)
+                    scores = torch.nn.functional.softmax(output.logits, dim=1)
+                    predictions = scores.argmax(dim=1).tolist()
+                scores = scores.tolist()
+
+                for i, row, prediction in zip(batch, scores, predictions):
+                    results[i] = (self.labels[prediction], {
+                        'negative': row[0],
+                        'neutral': row[1],
+                        'positive': row[2]
+                    })
             except Exception as e:
-                print(f"Error in sentiment analysis: {e}")
-                sentiment_results.append({
-                    'title': article['title'],
-                    'summary': article['summary'],
-                    'sentiment': 'Neutral',
-                    'scores': {'positive': 0.33, 'neutral': 0.34, 'negative': 0.33}
-                })
+                print(f"Error in batch sentiment analysis, retrying texts individually: {e}")
+                for i in batch:
+                    try:
+                        results[i] = self.get_sentiment_scores(texts[i], raise_errors=True)
+                    except Exception as e:
+                        print(f"Error in sentiment analysis: {e}")
+
+        return results
+
+    def score_shared(self, texts):
+        """
+        get_sentiment_scores_batch, routed through the shared scheduler when one is configured.
+        """
+        if self.scheduler is not None:
+            return self.scheduler.run('sentiment', texts)
+        return self.get_sentiment_scores_batch(texts)
+
+    def analyze_sentiment(self, articles):
+        texts = [article.get('summary') for article in articles]
+        with stage('sentiment', items=len(texts)):
+            if self.cache is not None and all(isinstance(text, str) for text in texts):
+                scored = self.cache.map(self.backend.cache_id(self.model_name), texts, self.score_shared)
+            else:
+                scored = self.score_shared(texts)
+
+        sentiment_results = []
+        for article, result in zip(articles, scored):
+            sentiment, sentiment_scores = result if result is not None else self.default_result
+            sentiment_results.append({
+                'title': article.get('title'),
+                'summary': article.get('summary'),
+                'sentiment': sentiment.capitalize(),
+                'scores': dict(sentiment_scores)
+            })
         
-        return sentiment_results
\ No newline at end of file
+        return sentiment_results
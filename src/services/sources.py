@@ -0,0 +1,32 @@
+# Kept free of model imports, so the parser benchmark can read the sources and
+# their extraction rules without loading spaCy or torch.
+# Using more accessible news sources; html sources declare their extraction rules as data
+NEWS_SOURCES = [
+    {
+        'url': 'https://news.google.com/rss/search?q=',
+        'type': 'rss'
+    },
+    {
+        'url': 'https://www.marketwatch.com/search?q=',
+        'type': 'html',
+        # Extraction rules for the search page (CSS selectors, see services/parsers.py)
+        'rules': {
+            'item': 'div.article__content',
+            'title': 'h3',
+            'summary': 'p',
+            'link': 'a[href]',
+            'base_url': 'https://www.marketwatch.com'
+        }
+    },
+    {
+        'url': 'https://www.techradar.com/search?searchTerm=',
+        'type': 'html',
+        'rules': {
+            'item': 'div.article-card',
+            'title': 'h3',
+            'summary': 'p',
+            'link': 'a[href]',
+            'base_url': 'https://www.techradar.com'
+        }
+    }
+]
@@ -0,0 +1,133 @@
+import re
+
+import torch
+from services.inference_backends import PyTorchBackend
+from services.token_packing import TokenPacker
+
+FALLBACK_TAKEAWAY = "Unable to generate summary at this time."
+
+
+class TakeawayBackend:
+    """
+    Produces the one-line key takeaway from a list of summarized articles.
+    """
+    name = 'base'
+
+    def generate(self, articles):
+        raise NotImplementedError
+
+    def _combined_ids(self, articles, packer):
+        # Combine all article summaries into one text, cut at a sentence boundary within the model's token budget;
+        # the packed token ids go to the model as they are, so the text is tokenized only once
+        combined_text = " ".join([article['summary'] for article in articles])
+        return packer.truncate(combined_text)
+
+
+class LlamaTakeawayBackend(TakeawayBackend):
+    """
+    Prompts a causal LM (LLaMA 2 by default) for a one-sentence summary.
+    """
+    name = 'llama'
+    PROMPT = "Summarize the following news articles into one concise sentence:"
+
+    def __init__(self, models, model_name="meta-llama/Llama-2-7b-hf", backend=None, max_input_tokens=1024):
+        self.models = models
+        self.model_name = model_name
+        self.backend = backend or PyTorchBackend()
+        self.models.register('llm', lambda: self.backend.load_text_generator(self.model_name, use_auth_token=True))
+        # Token budget for the articles in the prompt; LLaMA 2 allows 4096 but prompt length dominates latency
+        self.max_input_tokens = max_input_tokens
+        self._packer = None
+        self._prompt_ids = None
+
+    def generate(self, articles):
+        generator = self.models.get('llm')
+        if self._packer is None:
+            # The fixed instruction is tokenized once and prepended to every prompt
+            self._prompt_ids = generator.tokenizer(self.PROMPT, add_special_tokens=False)['input_ids']
+            self._packer = TokenPacker(generator.tokenizer, max_tokens=self.max_input_tokens)
+        input_ids = self._packer.with_special_tokens(self._prompt_ids + self._combined_ids(articles, self._packer))
+        input_ids = torch.tensor([input_ids], device=generator.model.device)
+        with torch.no_grad():
+            # max_new_tokens bounds the answer itself; max_length would count the prompt as well
+            output_ids = generator.model.generate(
+                input_ids=input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                max_new_tokens=50,
+                do_sample=False
+            )
+        # Only the generated continuation, not the prompt
+        return generator.tokenizer.decode(output_ids[0, input_ids.shape[1]:], skip_special_tokens=True).strip()
+
+
+class Seq2SeqTakeawayBackend(TakeawayBackend):
+    """
+    Uses a small distilled summarization model for a short abstractive takeaway.
+    """
+    name = 'seq2seq'
+
+    def __init__(self, models, model_name="sshleifer/distilbart-cnn-6-6", backend=None):
+        self.models = models
+        self.model_name = model_name
+        self.backend = backend or PyTorchBackend()
+        self.models.register('takeaway_seq2seq', lambda: self.backend.load_summarizer(self.model_name))
+        self._packer = None
+
+    def generate(self, articles):
+        summarizer = self.models.get('takeaway_seq2seq')
+        if self._packer is None:
+            self._packer = TokenPacker(summarizer.tokenizer)
+        encoded = summarizer.tokenizer.pad(
+            {'input_ids': [self._packer.with_special_tokens(self._combined_ids(articles, self._packer))]},
+            return_tensors='pt'
+        )
+        with torch.no_grad():
+            output_ids = summarizer.model.generate(**encoded, max_length=40, min_length=10, do_sample=False)
+        return first_sentence(summarizer.tokenizer.decode(output_ids[0], skip_special_tokens=True))
+
+
+class CentroidTakeawayBackend(TakeawayBackend):
+    """
+    Extractive takeaway: picks the summary whose embedding is closest to the
+    centroid of all summary embeddings and returns its first sentence.
+    Reuses the MiniLM embeddings from compare_articles, so no extra model is loaded.
+    """
+    name = 'centroid'
+
+    def __init__(self, encode):
+        # encode: list of summaries -> [N, dim] tensor (NewsController.encode_summaries)
+        self.encode = encode
+
+    def generate(self, articles):
+        summaries = [article['summary'] for article in articles if article.get('summary')]
+        if not summaries:
+            return FALLBACK_TAKEAWAY
+        if len(summaries) == 1:
+            return first_sentence(summaries[0])
+
+        embeddings = torch.nn.functional.normalize(self.encode(summaries).float(), dim=1)
+        centroid = torch.nn.functional.normalize(embeddings.mean(dim=0), dim=0)
+        best = int(torch.argmax(embeddings @ centroid))
+        return first_sentence(summaries[best])
+
+
+def first_sentence(text):
+    match = re.match(r'(.+?[.!?])(\s|$)', text.strip())
+    return match.group(1) if match else text.strip()
+
+
+TAKEAWAY_BACKENDS = ('llama', 'seq2seq', 'centroid')
+
+
+def create_takeaway_backend(name, models, encode, inference_backend=None):
+    """
+    Build the takeaway backend selected by name; only that backend's model gets registered.
+    inference_backend selects the runtime of that model (see inference_backends.py).
+    """
+    if name == 'llama':
+        return LlamaTakeawayBackend(models, backend=inference_backend)
+    if name == 'seq2seq':
+        return Seq2SeqTakeawayBackend(models, backend=inference_backend)
+    if name == 'centroid':
+        return CentroidTakeawayBackend(encode)
+    raise ValueError(f"Unknown takeaway backend '{name}', expected one of {', '.join(TAKEAWAY_BACKENDS)}")
@@ -18,16 +18,72 @@ class TextToSpeechService:
         return filename"""
 
 
+import hashlib
+import io
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
+from services.audio_store import AudioStore
+from services.metrics import stage
+
+
+class TTSEngine:
+    """
+    Turns one chunk of text into MP3 bytes.
+    """
+    name = 'base'
+
+    def synthesize(self, text, lang):
+        raise NotImplementedError
+
+
+class GTTSEngine(TTSEngine):
+    name = 'gtts'
+
+    def synthesize(self, text, lang):
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class SilentTTSEngine(TTSEngine):
+    """
+    Offline stand-in for gTTS: silence whose length follows the text length.
+    Useful for tests and benchmarks that must not touch the network.
+    """
+    name = 'silent'
+
+    def __init__(self, ms_per_char=60):
+        self.ms_per_char = ms_per_char
+
+    def synthesize(self, text, lang):
+        from pydub import AudioSegment
+
+        buffer = io.BytesIO()
+        AudioSegment.silent(duration=len(text) * self.ms_per_char).export(buffer, format='mp3')
+        return buffer.getvalue()
+
 
 class TextToSpeechService:
-    def __init__(self):
+    def __init__(self, engine=None, max_workers=4, store=None):
         self.static_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
         os.makedirs(self.static_folder, exist_ok=True)
+        self.engine = engine or GTTSEngine()
+        # Generated MP3s live in a bounded, sharded store under static/audio
+        self.store = store or AudioStore(
+            self.static_folder,
+            index_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'audio_index.db')
+        )
+        # Chunks are synthesized concurrently; gTTS is network bound
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts')
+
+    def audio_key(self, text, lang='en'):
+        """
+        Content hash of the audio, so identical text reuses the existing MP3.
+        """
+        return hashlib.sha256(f"{self.engine.name}\0{lang}\0{text}".encode('utf-8')).hexdigest()
 
-    def convert_text_to_speech(self, text):
+    def convert_text_to_speech(self, text, lang='en'):
         """
         Convert the given text to speech and save it as an MP3 file.
         Handles long text by splitting it into chunks if necessary.
@@ -37,22 +93,17 @@ class TextToSpeechService:
             if not text.strip():
                 raise ValueError("Text for TTS cannot be empty.")
 
-            # Generate unique filename using timestamp
-            filename = f'output_{int(time.time())}.mp3'
-            filepath = os.path.join(self.static_folder, filename)
+            key = self.audio_key(text, lang)
+            filename = self.store.get(key)
+            if filename is not None:
+                return filename
 
-            # Check if text exceeds gTTS limit (around 200 characters per chunk)
-            if len(text) > 200:
-                # Split text into smaller chunks
-                chunks = self._split_text_into_chunks(text, max_length=200)
-                # Combine audio chunks
-                self._combine_audio_chunks(chunks, filepath)
-            else:
-                # Convert text directly to speech
-                tts = gTTS(text=text, lang='en')
-                tts.save(filepath)
+            # gTTS handles around 200 characters per request, so longer text is split
+            chunks = self._split_text_into_chunks(text, max_length=200) if len(text) > 200 else [text]
+            with stage('tts', items=len(chunks)):
+                audio = self._combine_audio_chunks(chunks, lang)
 
-            return filename  # Return the filename for use in templates
+            return self.store.put(key, audio)  # Return the static-relative filename for use in templates
         except Exception as e:
             print(f"Error in TextToSpeechService: {e}")
             return None
@@ -79,32 +130,11 @@ class TextToSpeechService:
 
         return chunks
 
-    def _combine_audio_chunks(self, chunks, output_filepath):
+    def _combine_audio_chunks(self, chunks, lang='en'):
         """
-        Combine multiple audio chunks into a single MP3 file.
+        Synthesize chunks concurrently and join them in memory.
+        MP3 streams are sequences of self-contained frames, so the chunks are
+        concatenated as bytes (as gTTS does for its own parts) without decoding
+        and re-encoding.
         """
-        from pydub import AudioSegment
-        from pydub.playback import play
-
-        combined_audio = None
-
-        for chunk in chunks:
-            tts = gTTS(text=chunk, lang='en')
-            temp_filepath = os.path.join(self.static_folder, f'temp_{int(time.time())}.mp3')
-            tts.save(temp_filepath)
-
-            # Load the audio chunk
-            audio_chunk = AudioSegment.from_file(temp_filepath)
-
-            # Combine with the previous audio
-            if combined_audio is None:
-                combined_audio = audio_chunk
-            else:
-                combined_audio += audio_chunk
-
-            # Remove the temporary file
-            os.remove(temp_filepath)
-
-        # Export the combined audio to the output file
-        if combined_audio:
-            combined_audio.export(output_filepath, format="mp3")
\ No newline at end of file
+        return b''.join(self.executor.map(lambda chunk: self.engine.synthesize(chunk, lang), chunks))
@@ -0,0 +1,85 @@
+import re
+
+# Split after sentence punctuation but keep the whitespace with the next sentence, so the
+# pieces concatenate back to the original text and tokenize as they would in context
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])(?=\s)')
+
+
+def split_sentences(text):
+    return [sentence for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+class TokenPacker:
+    """
+    Packs whole sentences into chunks that fit a model's real token limit.
+
+    Every sentence of every text is tokenized in one tokenizer call; chunks are
+    built from those token ids, so callers can feed them to the model without
+    tokenizing again. A single sentence longer than the limit is split on token
+    boundaries as a last resort.
+    """
+
+    def __init__(self, tokenizer, max_tokens=None, default_max_tokens=1024):
+        self.tokenizer = tokenizer
+        # Some tokenizers report a huge sentinel instead of their model's limit
+        limit = getattr(tokenizer, 'model_max_length', None)
+        if not limit or limit > 100000:
+            limit = default_max_tokens
+        self.max_tokens = min(max_tokens or limit, limit)
+        # Room left for the special tokens the model input gets wrapped in
+        self.budget = self.max_tokens - tokenizer.num_special_tokens_to_add()
+
+    def sentence_ids(self, texts):
+        """
+        Token ids per sentence, per text.
+        """
+        sentences = [split_sentences(text) for text in texts]
+        flat = [sentence for text_sentences in sentences for sentence in text_sentences]
+        ids = self.tokenizer(flat, add_special_tokens=False)['input_ids'] if flat else []
+
+        result, position = [], 0
+        for text_sentences in sentences:
+            result.append(ids[position:position + len(text_sentences)])
+            position += len(text_sentences)
+        return result
+
+    def pack(self, sentence_ids, budget=None):
+        """
+        Greedily pack consecutive sentences into chunks of at most `budget` tokens.
+        """
+        budget = budget or self.budget
+        chunks, current = [], []
+        for ids in sentence_ids:
+            if len(ids) > budget:
+                # Oversized sentence: flush, then hard-split it
+                if current:
+                    chunks.append(current)
+                    current = []
+                chunks.extend(ids[start:start + budget] for start in range(0, len(ids), budget))
+                continue
+            if len(current) + len(ids) > budget:
+                chunks.append(current)
+                current = []
+            current.extend(ids)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def pack_texts(self, texts, budget=None):
+        """
+        Chunks (lists of token ids) for each text.
+        """
+        return [self.pack(ids, budget) for ids in self.sentence_ids(texts)]
+
+    def truncate(self, text, budget=None):
+        """
+        Token ids of the leading whole sentences of `text` that fit the budget.
+        """
+        chunks = self.pack_texts([text], budget)[0]
+        return chunks[0] if chunks else []
+
+    def with_special_tokens(self, ids):
+        return self.tokenizer.build_inputs_with_special_tokens(ids)
+
+    def decode(self, ids):
+        return self.tokenizer.decode(ids, skip_special_tokens=True)
@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from services.article_store import ArticleStore
+from services.dedup import ArticleDeduplicator
+
+WIRE_STORY = (
+    'Apple reported record quarterly revenue on Thursday, driven by strong iPhone sales '
+    'in China and growth in its services business, beating analyst expectations.'
+)
+
+
+def article(source, link, title, full_summary=WIRE_STORY):
+    return {'source': source, 'link': link, 'title': title, 'full_summary': full_summary, 'summary': title}
+
+
+def sentiment():
+    return {'sentiment': 'Positive', 'scores': {'positive': 0.9, 'neutral': 0.05, 'negative': 0.05}}
+
+
+def test_near_duplicates_of_stored_articles_are_not_processed_again(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.db'), deduplicator=ArticleDeduplicator())
+    google = article('Google News', 'https://news.google.com/a', 'Apple posts record revenue - Reuters')
+    store.save('Apple', [google], [sentiment()])
+
+    marketwatch = article('MarketWatch', 'https://marketwatch.com/b', 'Apple posts record revenue')
+    other = article('MarketWatch', 'https://marketwatch.com/c', 'Apple opens a store in Mumbai',
+                    'The company opened its first retail store in India to long queues of customers.')
+    assert store.filter_new('Apple', [marketwatch, other]) == [other]
+
+    stored, _ = store.window('Apple', 3600)
+    assert stored[0]['also_reported_by'] == [
+        {'source': 'MarketWatch', 'title': 'Apple posts record revenue', 'link': 'https://marketwatch.com/b'}
+    ]
+    # Seeing the copy again does not list it twice
+    store.filter_new('Apple', [dict(marketwatch, link='https://marketwatch.com/b')])
+    assert len(store.window('Apple', 3600)[0][0]['also_reported_by']) == 1
+
+
+def test_without_a_deduplicator_only_links_are_compared(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.db'))
+    store.save('Apple', [article('Google News', 'https://news.google.com/a', 'Apple posts record revenue')], [sentiment()])
+
+    copy = article('MarketWatch', 'https://marketwatch.com/b', 'Apple posts record revenue')
+    assert store.filter_new('Apple', [copy]) == [copy]
+    assert store.filter_new('Apple', [article('Google News', 'https://news.google.com/a', 'x')]) == []
+
+
+def test_window_batch_aggregates(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.db'))
+    articles = [
+        dict(article('A', 'https://a.com/1', 'One'), topics=['iPhone', 'China']),
+        dict(article('A', 'https://a.com/2', 'Two'), topics=['China', 'Services']),
+        dict(article('A', 'https://a.com/3', 'Three'), topics=['China', 'iPhone']),
+    ]
+    negative = {'sentiment': 'Negative', 'scores': {'positive': 0.1, 'neutral': 0.1, 'negative': 0.8}}
+    store.save('Apple', articles, [sentiment(), sentiment(), negative], embeddings=[[0.1, 0.2]] * 3)
+
+    batch = store.window_batch('Apple', 3600)
+    assert len(batch) == 3
+    assert batch.embeddings.shape == (3, 2)
+    assert batch.sentiment_counts() == {'negative': 1, 'neutral': 0, 'positive': 2}
+    assert batch.total_scores()['positive'] == pytest.approx(1.9)
+    assert batch.top_topics(10) == ['China', 'iPhone']
+    assert batch.top_topics(1) == ['China']
@@ -0,0 +1,47 @@
+import os
+
+from services.audio_store import AudioStore
+
+
+def test_get_drops_files_evicted_by_another_process(tmp_path):
+    app_store = AudioStore(str(tmp_path / 'static'))
+    worker_store = AudioStore(str(tmp_path / 'static'))
+
+    relative_path = worker_store.put('abcdef', b'mp3')
+    assert app_store.get('abcdef') == relative_path
+
+    os.remove(os.path.join(str(tmp_path / 'static'), *relative_path.split('/')))
+    assert app_store.get('abcdef') is None
+    assert app_store.stats()['files'] == 0
+
+
+def test_size_budget_is_shared_between_processes(tmp_path):
+    app_store = AudioStore(str(tmp_path / 'static'), max_bytes=250)
+    worker_store = AudioStore(str(tmp_path / 'static'), max_bytes=250)
+
+    app_store.put('aa0001', b'x' * 100)
+    worker_store.put('bb0002', b'x' * 100)
+    worker_store.put('cc0003', b'x' * 100)
+
+    # The least recently used file goes, whichever process wrote it
+    assert app_store.stats()['bytes'] == 200
+    assert app_store.get('aa0001') is None
+    assert app_store.get('cc0003') is not None
+
+
+def test_index_picks_up_existing_files(tmp_path):
+    shard = tmp_path / 'static' / 'audio' / 'ab'
+    shard.mkdir(parents=True)
+    (shard / 'abcdef.mp3').write_bytes(b'mp3')
+
+    store = AudioStore(str(tmp_path / 'static'))
+    assert store.get('abcdef') == 'audio/ab/abcdef.mp3'
+    assert store.stats()['bytes'] == 3
+
+
+def test_index_is_kept_outside_the_served_folder(tmp_path):
+    store = AudioStore(str(tmp_path / 'static'))
+    store.put('abcdef', b'mp3')
+
+    assert (tmp_path / 'data' / 'audio_index.db').exists()
+    assert not [path for path in (tmp_path / 'static').rglob('*') if path.suffix != '.mp3' and path.is_file()]
@@ -0,0 +1,50 @@
+from services.dedup import ArticleDeduplicator
+
+WIRE_STORY = (
+    'Apple reported record quarterly revenue on Thursday, driven by strong iPhone sales '
+    'in China and growth in its services business, beating analyst expectations for the '
+    'holiday quarter as investors looked ahead to new products.'
+)
+
+
+def article(source, title, full_summary):
+    return {'source': source, 'title': title, 'link': f'https://{source}/{len(title)}', 'full_summary': full_summary}
+
+
+def test_near_duplicates_cluster_and_distinct_stories_do_not():
+    dedup = ArticleDeduplicator()
+    articles = [
+        article('news.google.com', 'Apple posts record revenue - Reuters', WIRE_STORY),
+        article('www.techradar.com', 'Apple opens its first store in Mumbai',
+                'The company opened its first retail store in India to long queues of customers on Tuesday.'),
+        # Same wire text under a different headline, with an attribution added
+        article('www.marketwatch.com', 'Apple revenue hits a record', WIRE_STORY.replace('.', ', analysts said.')),
+        # Same headline once the publisher suffix and punctuation are dropped
+        article('news.google.com', 'Apple posts record revenue!', 'Short teaser.'),
+    ]
+
+    assert dedup.cluster(articles) == [[0, 2, 3], [1]]
+
+
+def test_fingerprints_within_max_distance_are_found_through_a_band():
+    dedup = ArticleDeduplicator(max_distance=3)
+    fingerprint = dedup.simhash(WIRE_STORY)
+    # Flip one bit in each of three bands; one band still matches exactly
+    close = fingerprint ^ (1 << 0) ^ (1 << 16) ^ (1 << 32)
+    far = fingerprint ^ (1 << 0) ^ (1 << 16) ^ (1 << 32) ^ (1 << 48)
+
+    known = {'close': ('title-a', close), 'far': ('title-b', far)}
+    assert dedup.match([{'title': 'Unrelated title', 'full_summary': WIRE_STORY}], known) == ['close']
+    assert dedup.match([{'title': 'Unrelated title', 'full_summary': WIRE_STORY}], {'far': known['far']}) == [None]
+
+
+def test_collapse_keeps_the_longest_article_and_lists_the_others():
+    dedup = ArticleDeduplicator()
+    short = article('news.google.com', 'Apple posts record revenue - Reuters', 'Apple posts record revenue.')
+    full = article('www.marketwatch.com', 'Apple posts record revenue', WIRE_STORY)
+
+    [representative] = dedup.collapse([short, full])
+    assert representative is full
+    assert representative['also_reported_by'] == [
+        {'source': 'news.google.com', 'title': short['title'], 'link': short['link']}
+    ]
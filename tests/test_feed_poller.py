@@ -0,0 +1,47 @@
+import threading
+from types import SimpleNamespace
+
+from services.feed_poller import FeedPoller
+
+
+class FakeNewsService:
+    news_sources = [{'url': 'https://news.google.com/rss/search?q=', 'type': 'rss'}]
+    deduplicator = None
+
+    def __init__(self, fetch_error=None):
+        self.fetch_error = fetch_error
+
+    def fetch_source(self, source, company_name, raise_errors=False):
+        if self.fetch_error is not None:
+            raise self.fetch_error
+        return [{'title': 'Apple posts record revenue', 'full_summary': 'Revenue rose.', 'link': 'https://a/1'}]
+
+
+def make_poller(news_service, store_new_articles):
+    controller = SimpleNamespace(news_service=news_service, store_new_articles=store_new_articles)
+    poller = FeedPoller(controller, ['Apple'])
+    poller._host_limits['news.google.com'] = threading.BoundedSemaphore(1)
+    return poller
+
+
+def test_processing_failure_does_not_back_off_the_host():
+    def store_new_articles(company, articles):
+        raise RuntimeError('summarizer failed')
+
+    poller = make_poller(FakeNewsService(), store_new_articles)
+    poller._poll('Apple', 0)
+
+    assert 'news.google.com' not in poller._backoff
+    assert poller.stats['processing_errors'] == 1
+    assert poller.stats['errors'] == 0
+    assert len(poller._schedule) == 1  # Polled again on the normal interval
+
+
+def test_fetch_failure_backs_off_the_host():
+    poller = make_poller(FakeNewsService(fetch_error=ConnectionError('refused')), lambda company, articles: articles)
+    poller._poll('Apple', 0)
+
+    failures, _ = poller._backoff['news.google.com']
+    assert failures == 1
+    assert poller.stats['errors'] == 1
+    assert len(poller._schedule) == 1
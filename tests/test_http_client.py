@@ -0,0 +1,58 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('requests')
+
+from services.http_client import HttpClient  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    clients = []
+    body = b'<rss>' + b'x' * 50000 + b'</rss>'
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            clients.append(self.client_address)
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/feed", clients
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def first_chunk(response):
+    return next(response.iter_content(chunk_size=1024))
+
+
+def test_small_body_stopped_early_keeps_the_connection(server):
+    url, clients = server
+    client = HttpClient()
+    for _ in range(3):
+        client.fetch(url, first_chunk, stream=True)
+
+    # Every request came over the same keep-alive connection
+    assert len(clients) == 3
+    assert len(set(clients)) == 1
+
+
+def test_large_rest_is_not_downloaded(server):
+    url, clients = server
+    client = HttpClient(drain_limit=1024)
+    for _ in range(2):
+        client.fetch(url, first_chunk, stream=True)
+
+    assert len(set(clients)) == 2
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from services.inference_scheduler import MicroBatcher
+
+
+def submit_concurrently(batcher, requests):
+    """
+    Submit each list of items from its own thread, in order; returns results (or errors) per request.
+    """
+    outcomes = [None] * len(requests)
+
+    def submit(index, items):
+        try:
+            outcomes[index] = batcher.submit(items)
+        except Exception as e:
+            outcomes[index] = e
+
+    threads = []
+    for index, items in enumerate(requests):
+        thread = threading.Thread(target=submit, args=(index, items))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)  # Keep the queue order deterministic
+    for thread in threads:
+        thread.join(timeout=5)
+    return outcomes
+
+
+def test_concurrent_submits_share_one_batch_and_get_their_own_results():
+    batches = []
+
+    def batch_fn(items):
+        batches.append(list(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher('test', batch_fn, max_batch_size=8, max_wait_ms=500)
+    outcomes = submit_concurrently(batcher, [['a', 'b'], ['c']])
+
+    assert batches == [['a', 'b', 'c']]
+    assert outcomes == [['A', 'B'], ['C']]
+
+
+def test_request_that_would_overflow_the_batch_is_carried_to_the_next():
+    batches = []
+
+    def batch_fn(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher('test', batch_fn, max_batch_size=3, max_wait_ms=500)
+    outcomes = submit_concurrently(batcher, [[1, 2], [3, 4], [5]])
+
+    assert batches == [[1, 2], [3, 4, 5]]
+    assert outcomes == [[2, 4], [6, 8], [10]]
+
+
+def test_a_failing_batch_raises_in_every_caller():
+    def batch_fn(items):
+        raise RuntimeError('model failed')
+
+    batcher = MicroBatcher('test', batch_fn, max_batch_size=8, max_wait_ms=500)
+    outcomes = submit_concurrently(batcher, [['a'], ['b']])
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    # The batcher keeps serving after a failure
+    batcher.batch_fn = lambda items: items
+    assert batcher.submit(['c']) == ['c']
+
+
+def test_empty_submit_does_not_reach_the_model():
+    batcher = MicroBatcher('test', lambda items: pytest.fail('batch_fn called'), max_wait_ms=1)
+    assert batcher.submit([]) == []
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from services.job_queue import LeaseLostError, SQLiteJobBroker, WorkerPool
+
+
+def test_expired_lease_puts_the_job_back_in_the_queue(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / 'jobs.db'), lease_seconds=0.05)
+    job_id = broker.submit({'company_name': 'Apple'})
+
+    assert broker.claim()[0] == job_id
+    assert broker.claim() is None  # Leased to the first worker
+
+    time.sleep(0.1)  # The first worker died without finishing
+    assert broker.claim()[0] == job_id
+    assert broker.get(job_id)['status'] == 'running'
+
+
+def test_renewed_lease_keeps_the_job(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / 'jobs.db'), lease_seconds=0.2)
+    job_id = broker.submit({'company_name': 'Apple'})
+    broker.claim()
+
+    for _ in range(3):
+        time.sleep(0.1)
+        broker.renew(job_id, 1)
+        assert broker.claim() is None
+
+
+def test_job_that_keeps_losing_its_worker_fails(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / 'jobs.db'), lease_seconds=0.01, max_attempts=2)
+    job_id = broker.submit({'company_name': 'Apple'})
+    for _ in range(2):
+        assert broker.claim()[0] == job_id
+        time.sleep(0.05)
+
+    assert broker.claim() is None
+    assert broker.get(job_id)['status'] == 'failed'
+
+
+def test_start_replaces_dead_workers(tmp_path):
+    pool = WorkerPool(
+        lambda: SQLiteJobBroker(str(tmp_path / 'jobs.db')),
+        object,
+        workers=2,
+        start_method='fork'
+    )
+    try:
+        pool.start()
+        pool.processes[0].kill()
+        pool.processes[0].join(timeout=5)
+        assert pool.alive() == 1
+
+        pool.start()
+        assert pool.alive() == 2
+        assert sorted(process.name for process in pool.processes) == ['analysis-worker-0', 'analysis-worker-1']
+    finally:
+        pool.stop()
+
+
+def test_reclaimed_job_drops_the_first_attempts_events(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / 'jobs.db'), lease_seconds=0.05)
+    job_id = broker.submit({'company_name': 'Apple'})
+    _, _, first = broker.claim()
+    broker.add_event(job_id, first, 'article', {'title': 'Partial'})
+
+    time.sleep(0.1)
+    _, _, second = broker.claim()
+    broker.add_event(job_id, second, 'article', {'title': 'Retry'})
+
+    job = broker.get(job_id)
+    assert job['attempt'] == second == 2
+    assert [event['data']['title'] for event in job['events']] == ['Retry']
+
+
+def test_worker_that_lost_its_lease_cannot_write(tmp_path):
+    broker = SQLiteJobBroker(str(tmp_path / 'jobs.db'), lease_seconds=0.05)
+    job_id = broker.submit({'company_name': 'Apple'})
+    _, _, first = broker.claim()
+    time.sleep(0.1)
+    _, _, second = broker.claim()
+
+    for write in (
+        lambda: broker.add_event(job_id, first, 'article', {}),
+        lambda: broker.complete(job_id, first, {}),
+        lambda: broker.fail(job_id, first, 'boom'),
+        lambda: broker.renew(job_id, first),
+    ):
+        with pytest.raises(LeaseLostError):
+            write()
+
+    broker.complete(job_id, second, {'articles': []})
+    assert broker.get(job_id)['status'] == 'done'
@@ -0,0 +1,35 @@
+import threading
+
+from services.metrics import MetricsRegistry
+
+
+def test_render_while_other_threads_add_label_sets():
+    metrics = MetricsRegistry()
+    metrics.define_histogram('stage_seconds', 'Stage latency.')
+    metrics.define_counter('lookups_total', 'Lookups.')
+
+    def record(worker):
+        for count in range(2000):
+            metrics.observe('stage_seconds', 0.01, stage=f'{worker}-{count}')
+            metrics.inc('lookups_total', model=f'{worker}-{count}')
+
+    threads = [threading.Thread(target=record, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    # Iterating the live dicts here raised "dictionary changed size during iteration"
+    while any(thread.is_alive() for thread in threads):
+        assert metrics.render().startswith('# HELP lookups_total Lookups.')
+    for thread in threads:
+        thread.join()
+    assert 'lookups_total{model="3-1999"} 1' in metrics.render()
+
+
+def test_render_prometheus_text():
+    metrics = MetricsRegistry()
+    metrics.define_histogram('stage_seconds', 'Stage latency.', buckets=[0.1, 1.0])
+    metrics.observe('stage_seconds', 0.5, stage='fetch')
+
+    text = metrics.render()
+    assert 'stage_seconds_bucket{stage="fetch",le="0.1"} 0' in text
+    assert 'stage_seconds_bucket{stage="fetch",le="+Inf"} 1' in text
+    assert 'stage_seconds_count{stage="fetch"} 1' in text
@@ -0,0 +1,28 @@
+import pytest
+
+from services.model_registry import ModelRegistry
+
+
+def test_registering_a_name_twice_is_an_error():
+    models = ModelRegistry()
+    models.register('summarizer', object)
+    with pytest.raises(ValueError):
+        models.register('summarizer', dict)
+
+
+def test_override_wins_over_later_registrations():
+    models = ModelRegistry()
+    models.register('summarizer', lambda: 'stand-in', override=True)
+    models.register('summarizer', lambda: 'real model')
+    assert models.get('summarizer') == 'stand-in'
+
+
+def test_lazy_registry_is_ready_until_warming_starts():
+    models = ModelRegistry()
+    models.register('summarizer', object)
+    assert models.ready()
+
+    models.warming = True
+    assert not models.ready()
+    models.get('summarizer')
+    assert models.ready()
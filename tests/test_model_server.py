@@ -0,0 +1,93 @@
+import threading
+import time
+from multiprocessing import AuthenticationError, Pipe
+
+import pytest
+
+from services.model_server import ModelServer, ModelServerClient, ModelServerError
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.calls = []
+
+    def run(self, name, items):
+        self.calls.append((name, items))
+        if name == 'broken':
+            raise ValueError('model failed')
+        return [f'{name}:{item}' for item in items]
+
+    def stats(self):
+        return {}
+
+
+class FakeModels:
+    warming = False
+
+    def ready(self):
+        return True
+
+    def status(self):
+        return {'summarizer': 'loaded'}
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ModelServer(
+        FakeScheduler(), FakeModels(), str(tmp_path / 'models.sock'),
+        authkey=b'secret', backends={'summarizer': 'int8'}
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while server.listener is None and time.monotonic() < deadline:
+        time.sleep(0.01)  # Listening
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(server):
+    return ModelServerClient(server.socket_path, authkey=b'secret', connect_timeout=5)
+
+
+def test_run_round_trip(server, client):
+    assert client.run('summarizer', ['a', 'b']) == ['summarizer:a', 'summarizer:b']
+    assert client.run('summarizer', []) == []  # Not sent at all
+    assert server.scheduler.calls == [('summarizer', ['a', 'b'])]
+
+
+def test_server_errors_are_raised_in_the_client(server, client):
+    with pytest.raises(ModelServerError, match='model failed'):
+        client.run('broken', ['a'])
+    # The connection stays usable
+    assert client.run('summarizer', ['a']) == ['summarizer:a']
+    assert server.stats['errors'] == 1
+
+
+def test_status_reports_the_models(client):
+    assert client.status() == {
+        'ready': True, 'lazy': True, 'models': {'summarizer': 'loaded'}, 'backends': {'summarizer': 'int8'}
+    }
+
+
+def test_dropped_connection_is_reopened_once(client):
+    # A connection whose server end has gone away, as after a server restart
+    stale, server_end = Pipe()
+    server_end.close()
+    client._local.connection = stale
+
+    assert client.run('summarizer', ['a']) == ['summarizer:a']
+
+
+def test_wrong_authkey_is_rejected(server):
+    with pytest.raises(AuthenticationError):
+        ModelServerClient(server.socket_path, authkey=b'wrong', connect_timeout=5).run('summarizer', ['a'])
+
+
+def test_client_reports_the_servers_backends(server):
+    client = ModelServerClient(server.socket_path, authkey=b'secret', connect_timeout=5)
+
+    assert client.backend_name('summarizer') == 'int8'
+    # Models the server does not list run on the default backend
+    assert client.backend_name('semantic') == 'pytorch'
@@ -0,0 +1,175 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('transformers')
+pytest.importorskip('spacy')
+pytest.importorskip('requests')
+pytest.importorskip('soupsieve')
+
+from services.model_registry import ModelRegistry  # noqa: E402
+from services.news_service import NewsService  # noqa: E402
+
+
+@pytest.fixture
+def service():
+    return NewsService(fetch_deadline=0.5)
+
+
+def test_failing_source_is_reported_as_error(service, monkeypatch):
+    def fetch_source(source, company_name, raise_errors=False):
+        if source['type'] == 'rss':
+            if raise_errors:
+                raise ConnectionError('refused')
+            return []
+        return [{'title': 'Title', 'full_summary': 'Summary', 'link': '', 'source': ''}]
+
+    monkeypatch.setattr(service, 'fetch_source', fetch_source)
+    results = {result['source']['type']: result for result in service.fetch_all_sources('Apple')}
+    assert {kind: result['status'] for kind, result in results.items()} == {'rss': 'error', 'html': 'ok'}
+    # A source that fails fast reports how long it took, not the deadline
+    assert results['rss']['latency'] < service.fetch_deadline / 2
+
+
+def test_concurrent_fetches_do_not_queue_behind_a_hung_source(service, monkeypatch):
+    release = threading.Event()
+
+    def fetch_source(source, company_name, raise_errors=False):
+        if source['type'] == 'rss':
+            release.wait(5)  # Hung source
+        return []
+
+    monkeypatch.setattr(service, 'fetch_source', fetch_source)
+    elapsed = []
+
+    def fetch():
+        start = time.perf_counter()
+        service.fetch_all_sources('Apple')
+        elapsed.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+
+    # Every call is bounded by its own deadline, not by the calls before it
+    assert max(elapsed) < 1.5
+
+
+@pytest.mark.parametrize('tokens', [1, 9, 15, 16, 40, 1000])
+def test_summary_budget_is_never_empty(service, tokens):
+    max_length, min_length = service._summary_budget(tokens, bucket_tokens=16)
+    assert max_length > min_length > 0
+    assert max_length <= 130
+
+
+class WordTokenizer:
+    model_max_length = 12
+
+    def __init__(self):
+        self.words = []
+
+    def __call__(self, texts, add_special_tokens=False):
+        ids = []
+        for text in texts:
+            row = []
+            for word in text.split():
+                if word not in self.words:
+                    self.words.append(word)
+                row.append(self.words.index(word))
+            ids.append(row)
+        return {'input_ids': ids}
+
+    def num_special_tokens_to_add(self):
+        return 0
+
+    def decode(self, ids, skip_special_tokens=True):
+        return ' '.join(self.words[i] for i in ids)
+
+
+def test_failed_chunks_are_kept_out_of_the_reduce_step(service, monkeypatch):
+    from services.token_packing import TokenPacker
+
+    service._summary_packer = TokenPacker(WordTokenizer())
+    reduced = []
+
+    def generate(chunks, max_length, min_length):
+        texts = [service.summary_packer.decode(chunk) for chunk in chunks]
+        if any('broken' in text for text in texts):
+            raise RuntimeError('model failed')
+        reduced.extend(texts)
+        return [text.split('.')[0] + '.' for text in texts]
+
+    monkeypatch.setattr(service, '_generate_summaries', generate)
+    good = "First part of a long article. " * 4
+    bad = "A long article with a broken sentence somewhere. " + "Second sentence of it. " * 3
+
+    summaries = service.summarize_batch([good, bad])
+    assert summaries[0] is not None
+    assert summaries[1] is None
+    assert not any('...' in text for text in reduced)
+
+
+def test_summary_cache_id_covers_packing_parameters():
+    ids = {
+        NewsService(summary_max_tokens=max_tokens, summary_bucket_tokens=bucket).summary_cache_id
+        for max_tokens in (None, 512) for bucket in (16, 32)
+    }
+    assert len(ids) == 4
+
+
+class CountingNLP:
+    """
+    spaCy stand-in that records every text it parses; capitalized words become ORG entities.
+    """
+
+    def __init__(self):
+        self.pipe_calls = []
+
+    def pipe(self, texts, batch_size=32, n_process=1):
+        texts = list(texts)
+        self.pipe_calls.append(texts)
+        for text in texts:
+            ents = [SimpleNamespace(text=word.strip('.,'), label_='ORG') for word in text.split()[1:] if word[0].isupper()]
+            yield SimpleNamespace(ents=ents, noun_chunks=[])
+
+
+WIRE_STORY = (
+    'Apple reported record quarterly revenue on Thursday, driven by strong iPhone sales '
+    'in China and growth in its Services business, beating analyst expectations.'
+)
+
+
+def test_articles_are_parsed_once_and_collapsed_stories_credit_every_source(monkeypatch):
+    nlp = CountingNLP()
+    models = ModelRegistry()
+    models.register('spacy', lambda: nlp, override=True)
+    service = NewsService(models=models, fetch_deadline=1)
+    monkeypatch.setattr(service, 'summarize_shared', lambda texts: list(texts))
+
+    def fetch_source(source, company_name, raise_errors=False):
+        host = source['url'].split('/')[2]
+        if host == 'www.techradar.com':
+            return [{'title': 'Apple opens a Mumbai store', 'full_summary': 'Queues formed at the Mumbai Store.',
+                     'link': 'https://www.techradar.com/1', 'source': host}]
+        # The same wire story from Google News and MarketWatch
+        return [{'title': 'Apple posts record revenue', 'full_summary': WIRE_STORY,
+                 'link': f'https://{host}/1', 'source': host}]
+
+    monkeypatch.setattr(service, 'fetch_source', fetch_source)
+    result = service.fetch_news('Apple')
+
+    assert result['duplicates_collapsed'] == 1
+    # One nlp.pipe pass over the collapsed articles, each text parsed once
+    assert len(nlp.pipe_calls) == 1
+    assert len(nlp.pipe_calls[0]) == len(result['articles']) == 2
+
+    topics = {name: summary['topics'] for name, summary in result['comparative_analysis'].items()}
+    assert 'China' in topics['news.google.com']
+    assert 'China' in topics['www.marketwatch.com']
+    assert 'China' not in topics['www.techradar.com']
+    assert 'Mumbai' in topics['www.techradar.com']
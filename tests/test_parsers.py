@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+pytest.importorskip('bs4')
+
+from services.parsers import get_extractor, parse_rss_items  # noqa: E402
+from services.sources import NEWS_SOURCES  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+MARKETWATCH_RULES = next(source['rules'] for source in NEWS_SOURCES if 'marketwatch' in source['url'])
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def chunked(content, size=512):
+    return (content[start:start + size] for start in range(0, len(content), size))
+
+
+def test_rss_parsing_stops_at_the_item_limit():
+    items = parse_rss_items(chunked(read_fixture('google_news_rss.xml')), limit=3)
+
+    assert len(items) == 3
+    assert items[0]['title'] == 'Apple beats quarterly earnings estimates - Reuters'
+    assert items[0]['link'].startswith('https://news.google.com/rss/articles/CBMi0000')
+    assert items[0]['description'].startswith('<a href="https://news.google.com/rss/articles/CBMi0000')
+
+
+def test_rss_items_are_found_in_a_default_namespace():
+    feed = (
+        b'<?xml version="1.0"?>'
+        b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/">'
+        b'<channel><title>Feed</title></channel>'
+        b'<item><title>First</title><link>https://example.com/1</link><description>One</description></item>'
+        b'<item><title>Second</title><link>https://example.com/2</link></item>'
+        b'</rdf:RDF>'
+    )
+
+    assert parse_rss_items(chunked(feed, size=16)) == [
+        {'title': 'First', 'description': 'One', 'link': 'https://example.com/1'},
+        {'title': 'Second', 'description': '', 'link': 'https://example.com/2'}
+    ]
+
+
+def test_html_extractor_applies_the_source_rules():
+    extractor = get_extractor(MARKETWATCH_RULES)
+    assert get_extractor(dict(MARKETWATCH_RULES)) is extractor  # Compiled once per rules
+
+    items = extractor.extract(read_fixture('marketwatch_search.html'), limit=2)
+    assert len(items) == 2
+    assert items[0]['title'] == 'Apple beats quarterly earnings estimates'
+    assert items[0]['summary'].startswith('Apple said on Tuesday it beats quarterly earnings estimates')
+    # Relative links are resolved against the source's base_url
+    assert items[0]['link'] == 'https://www.marketwatch.com/story/apple-beats-quarterly-earnings-estimates-0'
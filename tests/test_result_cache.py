@@ -0,0 +1,46 @@
+import time
+
+from services.result_cache import ResultCache
+
+
+def test_map_does_not_store_failures(tmp_path):
+    cache = ResultCache(db_path=str(tmp_path / 'cache.db'))
+    calls = []
+
+    def compute(texts):
+        calls.append(list(texts))
+        return [None if text == 'flaky' else text.upper() for text in texts]
+
+    assert cache.map('model', ['ok', 'flaky'], compute) == ['OK', None]
+    # The failed text is computed again, the good one comes from the cache
+    assert cache.map('model', ['ok', 'flaky'], compute) == ['OK', None]
+    assert calls == [['ok', 'flaky'], ['flaky']]
+
+    # Failures are not persisted either
+    reopened = ResultCache(db_path=str(tmp_path / 'cache.db'))
+    assert reopened.get('model', 'ok') == 'OK'
+    assert reopened.get('model', 'flaky') is None
+
+
+def test_disk_tier_is_bounded_by_size(tmp_path):
+    cache = ResultCache(max_bytes=1024 * 1024, db_path=str(tmp_path / 'cache.db'),
+                        max_disk_bytes=4000, prune_every=1)
+    for i in range(20):
+        cache.set('model', f'text {i}', 'x' * 500)
+
+    rows = cache._db.execute('SELECT COUNT(*), SUM(LENGTH(value)) FROM results').fetchone()
+    assert rows[1] <= 4000
+    assert cache.stats['disk_evictions'] == 20 - rows[0]
+    # The newest entries are the ones kept
+    assert cache._db.execute('SELECT 1 FROM results WHERE key = ?', (cache.make_key('model', 'text 19'),)).fetchone()
+
+
+def test_disk_tier_drops_old_entries_on_open(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResultCache(db_path=path)
+    cache.set('model', 'old', 'value')
+    cache._db.execute('UPDATE results SET created_at = ?', (time.time() - 3600,))
+    cache._db.commit()
+
+    reopened = ResultCache(db_path=path, max_age_seconds=60)
+    assert reopened.get('model', 'old') is None